@@ -1,13 +1,19 @@
 from . import core as es  # noqa: F401
+from .admission import AdmissionController as AdmissionController
+from .batch import Columns as Columns
+from .batch import flush_batches as flush_batches
 from .breakpoint import step_out as step_out
 from .context import EVENT as EVENT
 from .context import Contexts as Contexts
 from .context import CtxItem as CtxItem
+from .context import LayeredContexts as LayeredContexts
 from .context import shared_suppliers as shared_suppliers
 from .core import ExceptionEvent as ExceptionEvent
 from .core import make_event as make_event
 from .core import post as post
 from .core import publish as publish
+from .core import publish_wait as publish_wait
+from .core import try_publish as try_publish
 from .core import waterfall as waterfall
 from .decorate import allow_event as allow_event
 from .decorate import bind as bind
@@ -21,9 +27,15 @@ from .exceptions import ExitState as ExitState
 from .exceptions import ProviderUnsatisfied as ProviderUnsatisfied
 from .exceptions import UnresolvedRequirement as UnresolvedRequirement
 from .exceptions import switch_print_traceback as switch_print_traceback
+from .executor import ExecutorStats as ExecutorStats
+from .executor import MonitoredExecutor as MonitoredExecutor
+from .executor import default_process_pool as default_process_pool
+from .executor import process_pool as process_pool
+from .executor import thread_pool as thread_pool
 from .overload import apply_overload as apply_overload
 from .overload import call_overload as call_overload
 from .overload import overload as overload  # noqa: F401
+from .provider import FunctionalProvider as FunctionalProvider
 from .provider import Param as Param
 from .provider import Provider as Provider
 from .provider import ProviderFactory as ProviderFactory
@@ -33,6 +45,11 @@ from .publisher import Publisher as Publisher
 from .publisher import define as define
 from .publisher import gather as gather
 from .ref import deref as deref
+from .schedule import Scheduled as Scheduled
+from .schedule import TimerWheel as TimerWheel
+from .schedule import publish_after as publish_after
+from .schedule import publish_at as publish_at
+from .schedule import publish_every as publish_every
 from .scope import Scope as Scope
 from .scope import on as on
 from .scope import on_global as on_global
@@ -50,3 +67,5 @@ from .subscriber import get_params as get_params
 from .subscriber import param as param
 from .utils import Force as Force
 from .utils import Result as Result
+from .window import Window as Window
+from .window import WindowClosed as WindowClosed
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from .publisher import _publishers, get_publishers
+from .utils import _EventSystem, add_task
+
+
+class AdmissionController:
+    """过载时的事件准入控制
+
+    负载取在途事件数与事件循环延迟相对各自阈值的较大比值；负载达到 1 时，
+    事件所属 Publisher 的最小优先级数值大于 `critical_priority` 的事件被丢弃，
+    其余事件照常接纳，并可经由 `publish_wait` 排队等待名额。
+    """
+
+    def __init__(self, max_in_flight: int | None = None, max_lag: float | None = None, critical_priority: int = 0, interval: float = 0.1):
+        self.max_in_flight = max_in_flight
+        """在途事件数阈值"""
+        self.max_lag = max_lag
+        """事件循环延迟阈值，单位为秒"""
+        self.critical_priority = critical_priority
+        """过载时仍被接纳的 Publisher 优先级上限"""
+        self.interval = interval
+        """事件循环延迟的采样间隔"""
+        self.lag = 0.0
+        """最近一次采样得到的事件循环延迟"""
+        self._monitor: asyncio.Task | None = None
+
+    async def _measure(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - start - self.interval)
+
+    def _ensure_monitor(self):
+        if self._monitor is None or self._monitor.done():
+            self._monitor = add_task(self._measure())
+
+    def pressure(self) -> float:
+        """当前负载，不小于 1 时视为过载"""
+        pressure = 0.0
+        if self.max_in_flight:
+            pressure = _EventSystem.limiter.in_flight / self.max_in_flight
+        if self.max_lag:
+            self._ensure_monitor()
+            pressure = max(pressure, self.lag / self.max_lag)
+        return pressure
+
+    def admit(self, event: Any) -> bool:
+        """判断事件是否被接纳；被丢弃的事件计入所属 Publisher 的 `shed`"""
+        if self.pressure() < 1:
+            return True
+        pubs = get_publishers(event)
+        if pubs and min(pub.priority for pub in pubs.values()) <= self.critical_priority:
+            return True
+        for pub in pubs.values():
+            pub.shed += 1
+        return False
+
+    def stats(self) -> dict[str, int]:
+        """各 Publisher 被丢弃的事件数"""
+        return {pub.id: pub.shed for pub in _publishers.values() if pub.shed}
+
+    def close(self):
+        if self._monitor:
+            self._monitor.cancel()
+            self._monitor = None
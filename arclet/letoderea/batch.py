@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from array import array
+from collections.abc import Callable, Sequence
+from operator import attrgetter
+from typing import Any, Generic, TypeVar, get_args, get_origin
+from weakref import WeakSet
+
+from tarina import is_async, signatures
+
+from .context import EVENT, Contexts
+from .provider import provide
+from .subscriber import Subscriber
+from .utils import ExecutorMode, _EventSystem, add_task
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+T = TypeVar("T")
+_batchers: WeakSet[Batcher] = WeakSet()
+_TYPECODES = {int: "q", float: "d", bool: "b", "int": "q", "float": "d", "bool": "b"}
+_layouts: dict[type, tuple[tuple[str, str | None], ...]] = {}
+
+
+def _layout(event_type: type) -> tuple[tuple[str, str | None], ...]:
+    if event_type not in _layouts:
+        fields: dict[str, Any] = getattr(event_type, "__event_fields__", {})
+        _layouts[event_type] = tuple((name, _TYPECODES.get(anno)) for name, anno in fields.items())
+    return _layouts[event_type]
+
+
+class Columns(Generic[T]):
+    """一批 `make_event` 事件的列式视图
+
+    字段布局取自 `make_event` 收集的 `__event_fields__`：`int`、`float`、`bool` 字段存放于连续的
+    `array.array`，安装了 NumPy 时以零拷贝的 `numpy.ndarray` 呈现；其余字段为列表。
+    以 `Columns[Event]` 标注批量订阅者的参数即可获得。
+    """
+
+    __slots__ = ("columns", "size")
+
+    def __init__(self, columns: dict[str, Any], size: int):
+        self.columns = columns
+        self.size = size
+
+    @classmethod
+    def of(cls, event_type: type[T], events: Sequence[T]) -> Columns[T]:
+        columns: dict[str, Any] = {}
+        for name, typecode in _layout(event_type):
+            values = map(attrgetter(name), events)
+            if typecode is None:
+                columns[name] = list(values)
+            elif np is not None:
+                columns[name] = np.frombuffer(array(typecode, values), dtype=bool if typecode == "b" else typecode)
+            else:
+                columns[name] = array(typecode, values)
+        return cls(columns, len(events))
+
+    def __getattr__(self, item: str) -> Any:
+        try:
+            return self.columns[item]
+        except KeyError:
+            raise AttributeError(item) from None
+
+    def __getitem__(self, item: str) -> Any:
+        return self.columns[item]
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({', '.join(self.columns)}; size={self.size})"
+
+
+def _unwrap_list(annotation: Any) -> Any:
+    if get_origin(annotation) in (list, Columns) and (args := get_args(annotation)):
+        return args[0]
+    return annotation
+
+
+class Batcher:
+    """将匹配的事件缓冲起来，凑满 `batch_size` 个或等待 `max_delay` 秒后一次性调用处理函数
+
+    每个事件先按处理函数的签名解析参数，`list[X]` 与 `Columns[X]` 标注的参数按 `X` 解析；
+    调用处理函数时，每个参数得到由各事件对应值组成的列表，`Columns[X]` 参数得到列式视图。
+    """
+
+    def __init__(self, func: Callable[..., Any], batch_size: int, max_delay: float = 0.05, executor: ExecutorMode = "thread"):
+        self.func = func
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.buffer: list[dict[str, Any]] = []
+        self.columnar = {name: get_args(anno)[0] for name, anno, _ in signatures(func) if get_origin(anno) is Columns and get_args(anno)}
+        """以 `Columns[X]` 标注的参数及其事件类型"""
+        self.handler = Subscriber(self._proxy(), executor=executor)
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+        self._closed = False
+        _batchers.add(self)
+
+    def _proxy(self) -> Callable[..., Any]:
+        # 处理函数上的传播器与额外 Provider 作用于逐个事件，由 collector 承载，批量调用时不再重复执行
+        func = self.func
+        if is_async(func):
+            async def call(**kwargs):
+                return await func(**kwargs)
+        else:
+            def call(**kwargs):
+                return func(**kwargs)
+
+        call.__signature__ = inspect.signature(func)  # type: ignore
+        call.__name__ = func.__name__
+        return call
+
+    def collector(self) -> Callable[..., Any]:
+        """生成逐个事件解析参数并放入缓冲区的函数，作为实际注册的订阅者"""
+        sig = inspect.signature(self.func)
+        annotations = {name: _unwrap_list(anno) for name, anno, _ in signatures(self.func) if anno is not None}
+        params = [p.replace(annotation=annotations.get(p.name, inspect.Parameter.empty)) for p in sig.parameters.values()]
+
+        async def collect(**kwargs):
+            self.add(kwargs)
+
+        collect.__signature__ = sig.replace(parameters=params, return_annotation=None)  # type: ignore
+        collect.__annotations__ = {p.name: p.annotation for p in params if p.annotation is not inspect.Parameter.empty}
+        collect.__name__ = self.func.__name__
+        collect.__qualname__ = self.func.__qualname__
+        collect.__module__ = self.func.__module__
+        if hasattr(self.func, "__propagates__"):
+            collect.__propagates__ = self.func.__propagates__  # type: ignore
+        # `Columns[X]` 参数逐个收集事件本身
+        providers = [provide(event_type, name, call=EVENT) for name, event_type in self.columnar.items()]
+        collect.__providers__ = [*getattr(self.func, "__providers__", []), *providers]  # type: ignore
+        return collect
+
+    def add(self, arguments: dict[str, Any]):
+        if self._closed:
+            # 已关闭的批量订阅者不再被冲刷，继续缓冲只会让事件悄然丢失
+            raise RuntimeError(f"batcher of {self.func.__qualname__!r} is closed")
+        global _guard
+        if _guard is None or _guard.done():
+            _guard = add_task(_flush_on_shutdown())
+        self.buffer.append(arguments)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            loop = _EventSystem.loop or asyncio.get_running_loop()
+            self._timer = loop.call_later(self.max_delay, self.flush)
+
+    def flush(self) -> asyncio.Task[None] | None:
+        """取出缓冲区中的全部事件，调度一次批量调用"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if not self.buffer:
+            return None
+        batch, self.buffer = self.buffer, []
+        return add_task(self._call(batch))
+
+    async def _call(self, batch: list[dict[str, Any]]):
+        context: Contexts = {name: [arguments[name] for arguments in batch] for name in batch[0]}  # type: ignore
+        async with self._lock:
+            try:
+                for name, event_type in self.columnar.items():
+                    context[name] = Columns.of(event_type, context[name])
+                await self.handler.handle(context)
+            except Exception as e:
+                # 与 dispatch 相同，以 ExceptionEvent 发布异常，其 origin 为本批次各事件解析出的参数；批量调用失败不影响后续批次
+                from .core import ExceptionEvent, publish_exc_event
+
+                publish_exc_event(ExceptionEvent(batch, self.handler, e))
+
+    def close(self, *_) -> asyncio.Task[None] | None:
+        """停止接收事件并冲刷剩余的缓冲"""
+        if self._closed:
+            return None
+        self._closed = True
+        _batchers.discard(self)
+        return self.flush()
+
+
+async def flush_batches():
+    """冲刷所有批量订阅者的缓冲区并等待处理完成，适合在关闭前调用
+
+    事件循环关闭 (如 `asyncio.run` 返回) 时取消剩余任务的同时会自动调用一次；
+    对于未经 `asyncio.run` 关闭的事件循环，退出时若其仍可用也会调用
+    """
+    batchers = list(_batchers)
+    await asyncio.gather(*(task for batcher in batchers if (task := batcher.flush())))
+    for batcher in batchers:
+        async with batcher._lock:
+            pass
+
+
+async def _flush_on_shutdown():
+    # 事件循环关闭时会取消并等待剩余任务，借此在循环关闭前冲刷缓冲区
+    try:
+        await asyncio.Event().wait()
+    except asyncio.CancelledError:
+        await flush_batches()
+        raise
+
+
+_guard: asyncio.Task[None] | None = None
+_EventSystem.exit_hooks.append(flush_batches)
@@ -1,10 +1,12 @@
 import asyncio
-from collections.abc import Awaitable, Callable
+import heapq
+from collections.abc import Awaitable, Callable, Hashable
+from itertools import count
 from types import CoroutineType
 from typing import Any, Generic, TypeVar, overload
 
-from .context import Contexts
-from .exceptions import BLOCK
+from .context import EVENT, Contexts
+from .exceptions import BLOCK, STOP
 from .provider import TProviders
 from .scope import on
 from .subscriber import RESULT, Subscriber
@@ -16,10 +18,11 @@ D1 = TypeVar("D1")
 
 
 class _step_iter(Generic[R, D]):
-    def __init__(self, step: "StepOut[R]", default: D, timeout: float):
+    def __init__(self, step: "StepOut[R] | KeyedStepOut[R]", default: D, timeout: float, *args: Any):
         self.step = step
         self.default = default
         self.timeout = timeout
+        self.args = args
 
     def __aiter__(self):
         return self
@@ -37,7 +40,7 @@ class _step_iter(Generic[R, D]):
     def __anext__(self: "_step_iter[R1, D1]") -> Awaitable[R1 | D1]: ...
 
     def __anext__(self):  # type: ignore
-        return self.step.wait(default=self.default, timeout=self.timeout)
+        return self.step.wait(*self.args, default=self.default, timeout=self.timeout)  # type: ignore
 
 
 class StepOut(Generic[R]):
@@ -131,6 +134,152 @@ class StepOut(Generic[R]):
             self.waiting = False
 
 
+class KeyedStepOut(Generic[R]):
+    """按键路由的 StepOut
+
+    只注册一个订阅者：事件的键不在等待表中时直接跳过处理函数，否则将处理结果交给等待该键的所有 `wait`。
+    所有等待的超时共用一个定时器。
+    """
+
+    def __init__(
+        self,
+        event: type,
+        handler: Callable[..., R],
+        key: Callable[[Any], Hashable],
+        providers: TProviders | None = None,
+        priority: int = 15,
+        block: bool = False,
+    ):
+        self.key = key
+        self.block = block
+        self.waiters: dict[Hashable, list[asyncio.Future[R]]] = {}
+        """等待表，键为事件的键"""
+        self._deadlines: list[tuple[float, int, asyncio.Future[R]]] = []
+        self._counter = count()
+        self._timer: asyncio.TimerHandle | None = None
+        self._dispose = False
+        self.handler: Subscriber[R] = on(event, handler, priority=priority, providers=providers)
+
+        async def _before(ctx: Contexts):
+            if self.key(ctx[EVENT]) not in self.waiters:
+                return STOP
+
+        async def _after(ctx: Contexts):
+            res = ctx[RESULT]
+            if res is None or not (futures := self.waiters.pop(self.key(ctx[EVENT]), None)):
+                return
+            for fut in futures:
+                if not fut.done():
+                    fut.set_result(res)
+            if self.block:
+                return BLOCK
+
+        self.handler.propagate(_before, prepend=True, priority=0)
+        self.handler.propagate(_after)
+
+    @property
+    def waiting(self) -> bool:
+        return bool(self.waiters)
+
+    def dispose(self):
+        if not self._dispose:
+            self._dispose = True
+            self.handler.dispose()
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            for futures in self.waiters.values():
+                for fut in futures:
+                    fut.cancel()
+            self.waiters.clear()
+            self._deadlines.clear()
+
+    def _arm(self, loop: asyncio.AbstractEventLoop):
+        deadline = self._deadlines[0][0]
+        if self._timer:
+            if self._timer.when() <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(deadline, self._expire, loop)
+
+    def _expire(self, loop: asyncio.AbstractEventLoop):
+        self._timer = None
+        now = loop.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            fut = heapq.heappop(self._deadlines)[2]
+            if not fut.done():
+                fut.set_exception(asyncio.TimeoutError())
+        if self._deadlines:
+            self._arm(loop)
+
+    @overload
+    def __call__(self, key: Hashable, *, default: D, timeout: float = 120) -> _step_iter[R, D]: ...
+
+    @overload
+    def __call__(self, key: Hashable, *, timeout: float = 120) -> _step_iter[R, None]: ...
+
+    def __call__(
+        self, key: Hashable, *, timeout: float = 120, default: D | None = None
+    ) -> _step_iter[R, D] | _step_iter[R, None]:
+        """等待键为 `key` 的事件并返回处理结果
+
+        参数:
+            key: 事件的键
+            default: 超时时返回的默认值
+            timeout: 等待超时时间
+        """
+        return _step_iter(self, default, timeout, key)  # type: ignore
+
+    @overload
+    async def wait(self: "KeyedStepOut[CoroutineType[Any, Any, R1]] | KeyedStepOut[Awaitable[R1]]", key: Hashable, *, timeout: float = 120) -> R1 | None: ...
+
+    @overload
+    async def wait(self: "KeyedStepOut[CoroutineType[Any, Any, R1]] | KeyedStepOut[Awaitable[R1]]", key: Hashable, *, default: R1 | D, timeout: float = 120) -> R1 | D: ...
+
+    @overload
+    async def wait(self: "KeyedStepOut[R1]", key: Hashable, *, timeout: float = 120) -> R1 | None: ...
+
+    @overload
+    async def wait(self: "KeyedStepOut[R1]", key: Hashable, *, default: R1 | D, timeout: float = 120) -> R1 | D: ...
+
+    async def wait(
+        self,
+        key: Hashable,
+        *,
+        timeout: float = 0.0,
+        default: Any = None,
+    ):
+        if self._dispose:
+            raise RuntimeError("This StepOut instance has been disposed and cannot be used anymore.")
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.waiters.setdefault(key, []).append(fut)
+        if timeout:
+            if len(self._deadlines) > 64 and len(self._deadlines) > 2 * sum(map(len, self.waiters.values())):
+                # 清理已完成等待遗留的超时项
+                self._deadlines = [item for item in self._deadlines if not item[2].done()]
+                heapq.heapify(self._deadlines)
+            heapq.heappush(self._deadlines, (loop.time() + timeout, next(self._counter), fut))
+            self._arm(loop)
+        try:
+            return await fut
+        except asyncio.TimeoutError:
+            return default
+        finally:
+            if (futures := self.waiters.get(key)) and fut in futures:
+                futures.remove(fut)
+                if not futures:
+                    del self.waiters[key]
+
+
+@overload
+def step_out(event: type, handler: Callable[..., R], *, key: Callable[[Any], Hashable], providers: TProviders | None = None, priority: int = 15, block: bool = False) -> KeyedStepOut[R]: ...
+
+
+@overload
+def step_out(event: type, *, key: Callable[[Any], Hashable], providers: TProviders | None = None, priority: int = 15, block: bool = False) -> Callable[[Callable[..., R]], KeyedStepOut[R]]: ...
+
+
 @overload
 def step_out(event: type, handler: Callable[..., R], *, providers: TProviders | None = None, priority: int = 15, block: bool = False) -> StepOut[R]: ...
 
@@ -143,14 +292,16 @@ def step_out(event: type, *, providers: TProviders | None = None, priority: int
 def step_out(*, priority: int = 15, block: bool = False) -> Callable[[Subscriber[R]], StepOut[R]]: ...
 
 
-def step_out(event: type | None = None, handler: Callable[..., R] | None = None, providers: TProviders | None = None, priority: int = 15, block: bool = False):
+def step_out(event: type | None = None, handler: Callable[..., R] | None = None, providers: TProviders | None = None, priority: int = 15, block: bool = False, key: Callable[[Any], Hashable] | None = None):
 
     if event is None:
         def decorator1(func: Subscriber[R], /) -> StepOut[R]:
             return StepOut(func, priority, block)
         return decorator1
 
-    def decorator(func: Callable[..., R], /) -> StepOut[R]:
+    def decorator(func: Callable[..., R], /) -> StepOut[R] | KeyedStepOut[R]:
+        if key is not None:
+            return KeyedStepOut(event, func, key, providers, priority, block)
         return StepOut(lambda: on(event, func, priority=priority, providers=providers), priority, block)
 
     if handler is not None:
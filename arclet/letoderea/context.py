@@ -1,3 +1,4 @@
+import sys
 from collections.abc import Awaitable, Callable
 from typing import Any, Generic, TypeVar, cast
 
@@ -7,29 +8,193 @@ T = TypeVar("T")
 class CtxItem(Generic[T]):
     @classmethod
     def make(cls, name: str) -> "CtxItem[T]":
-        return cast(CtxItem[T], cast(object, name))
+        # 驻留键名，使上下文查找可直接通过身份比较命中
+        return cast(CtxItem[T], cast(object, sys.intern(name)))
 
 
 class Contexts(dict[str, Any]):
     pass
 
 
+_MISSING: Any = object()
+_get = dict.get
+
+
+class LayeredContexts(Contexts):
+    """叠加在底层上下文之上的上下文
+
+    写入仅作用于本层，读取时本层未命中的键会回退到底层上下文，因此创建时无需复制底层内容。
+    删除底层中的键时，会先将底层内容合并到本层。
+
+    在本层存活期间，底层上下文不应再被修改；需要独立快照时请使用 `copy`。
+    """
+
+    __slots__ = ("base",)
+
+    def __init__(self, base: Contexts, *args, **kwargs):
+        if args or kwargs:
+            dict.update(self, *args, **kwargs)
+        self.base = base
+
+    def __missing__(self, key: str):
+        base = self.base
+        while base.__class__ is LayeredContexts:
+            if (value := _get(base, key, _MISSING)) is not _MISSING:
+                return value
+            base = base.base  # type: ignore
+        return base[key]
+
+    def __contains__(self, key: object):
+        return dict.__contains__(self, key) or key in self.base
+
+    def get(self, key: str, default: Any = None):
+        ctx = self
+        while ctx.__class__ is LayeredContexts:
+            if (value := _get(ctx, key, _MISSING)) is not _MISSING:
+                return value
+            ctx = ctx.base  # type: ignore
+        return ctx.get(key, default)
+
+    def setdefault(self, key: str, default: Any = None):
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def _materialize(self):
+        """将底层内容合并到本层，并与底层脱离"""
+        if self.base:
+            local = dict(dict.items(self))
+            dict.clear(self)
+            dict.update(self, self.base.flatten() if isinstance(self.base, LayeredContexts) else self.base)
+            dict.update(self, local)
+        self.base = _EMPTY
+
+    def __delitem__(self, key: str):
+        if key in self.base:
+            self._materialize()
+        dict.__delitem__(self, key)
+
+    def pop(self, key: str, default: Any = _MISSING):
+        if key in self.base:
+            self._materialize()
+        if default is _MISSING:
+            return dict.pop(self, key)
+        return dict.pop(self, key, default)
+
+    def popitem(self):
+        self._materialize()
+        return dict.popitem(self)
+
+    def clear(self):
+        dict.clear(self)
+        self.base = _EMPTY
+
+    def flatten(self) -> Contexts:
+        """合并所有层，得到一个普通的上下文"""
+        res = Contexts(self.base.flatten() if isinstance(self.base, LayeredContexts) else self.base)
+        res.update(dict.items(self))
+        return res
+
+    copy = flatten
+
+    def keys(self):
+        return self.flatten().keys()
+
+    def values(self):
+        return self.flatten().values()
+
+    def items(self):
+        return self.flatten().items()
+
+    def __iter__(self):
+        return iter(self.flatten())
+
+    def __reversed__(self):
+        return reversed(self.flatten())
+
+    def __len__(self):
+        return len(self.flatten())
+
+    def __bool__(self):
+        return dict.__len__(self) > 0 or bool(self.base)
+
+    def __or__(self, other):
+        res = self.flatten()
+        res.update(other)
+        return res
+
+    def __ror__(self, other):
+        res = Contexts(other)
+        res.update(self.flatten())
+        return res
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __eq__(self, other: object):
+        if isinstance(other, LayeredContexts):
+            other = other.flatten()
+        return self.flatten() == other
+
+    def __ne__(self, other: object):
+        return not self == other
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return repr(self.flatten())
+
+
+_EMPTY = Contexts()
+
+
 EVENT = CtxItem[Any].make("$event")
+DEPEND_CACHE = CtxItem[dict].make("$depend_cache")
 shared_suppliers = []
 
 
-async def generate_contexts(
-    event: T, supplier:  Callable[[T, Contexts], Awaitable[Contexts | None]] | None = None, inherit_ctx: Contexts | None = None
+async def generate_base_contexts(event: Any, inherit_ctx: Contexts | None = None) -> tuple[Contexts, dict[str, Any]]:
+    """构造事件的基础上下文，同一事件的所有发布者共用
+
+    shared_suppliers 每个事件只执行一次，此时发布者提供的内容尚未写入，因此其中只能读取 `$event` 与 `inherit_ctx` 的内容。
+    返回基础上下文，以及 shared_suppliers 写入的条目
+    """
+    contexts = Contexts(inherit_ctx) if inherit_ctx else Contexts()
+    contexts[EVENT] = event
+    if not shared_suppliers:
+        return contexts, {}
+    layer = LayeredContexts(contexts)
+    for gather in shared_suppliers:
+        await gather(layer)
+    shared = dict(dict.items(layer))
+    contexts.update(shared)
+    return contexts, shared
+
+
+async def overlay_contexts(
+    base: Contexts, shared: dict[str, Any], event: T, supplier: Callable[[T, Contexts], Awaitable[Contexts | None]] | None = None
 ) -> Contexts:
-    contexts: Contexts = {EVENT: event, "$depend_cache": {}}  # type: ignore
+    """在基础上下文上叠加某一发布者提供的内容"""
+    contexts = LayeredContexts(base)
+    contexts[DEPEND_CACHE] = {}
     if supplier:
         await supplier(event, contexts)
     elif (_gather := getattr(event, "__context_gather__", getattr(event, "gather", None))) is not None:  # pragma: no cover
         await _gather(contexts)
-    if shared_suppliers:
-        for gather in shared_suppliers:
-            await gather(contexts)
-    if inherit_ctx:
-        inherit_ctx.update(contexts)
-        return inherit_ctx
+    for key in shared:
+        # shared_suppliers 提供的内容优先于发布者提供的内容
+        if dict.__contains__(contexts, key):
+            dict.__setitem__(contexts, key, shared[key])
+    return contexts
+
+
+async def generate_contexts(
+    event: T, supplier:  Callable[[T, Contexts], Awaitable[Contexts | None]] | None = None, inherit_ctx: Contexts | None = None
+) -> Contexts:
+    base, shared = await generate_base_contexts(event, inherit_ctx)
+    contexts = await overlay_contexts(base, shared, event, supplier)
+    if inherit_ctx is not None:
+        inherit_ctx.update(contexts.flatten())
     return contexts
@@ -43,7 +43,15 @@ class Contexts(dict[str, Any]):
     def pop(self, key: str, default: T, /) -> Any | T: ...
     def __delitem__(self, key: str | CtxItem, /) -> None: ...
 
+class LayeredContexts(Contexts):
+    base: Contexts
+    def __init__(self, base: Contexts, *args: Any, **kwargs: Any) -> None: ...
+    def flatten(self) -> Contexts: ...
+    def copy(self) -> Contexts: ...  # type: ignore[override]
+
 EVENT: CtxItem[Any]
 shared_suppliers: list[Callable[[Contexts], Awaitable[None]]]
 
+async def generate_base_contexts(event: Any, inherit_ctx: Contexts | None = None) -> tuple[Contexts, dict[str, Any]]: ...
+async def overlay_contexts(base: Contexts, shared: dict[str, Any], event: T, supplier: Callable[[T, Contexts], Awaitable[Contexts | None]] | None = None) -> Contexts: ...
 async def generate_contexts(event: T, supplier:  Callable[[T, Contexts], Awaitable[Contexts | None]] | None = None, inherit_ctx: Contexts | None = None) -> Contexts: ...
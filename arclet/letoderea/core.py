@@ -2,22 +2,24 @@ from __future__ import annotations
 
 import asyncio
 import atexit
+import traceback
 from collections import defaultdict
 from collections.abc import AsyncGenerator, Awaitable, Callable, Coroutine, Iterable
 from dataclasses import dataclass
-from itertools import chain
+from functools import partial
+from heapq import merge
 from operator import attrgetter
 from types import AsyncGeneratorType
 from typing import Any, TypeVar, cast, overload
 from typing_extensions import dataclass_transform
 
-from .context import Contexts, generate_contexts
-from .exceptions import BLOCK, STOP, _ExitException
+from .context import Contexts, LayeredContexts, generate_base_contexts, generate_contexts, overlay_contexts
+from .exceptions import BLOCK, STOP, ExceptionHandler, _ExitException
 from .provider import get_providers, provide
-from .publisher import Publisher, _publishers, define, gather, get_publishers
-from .scope import Scope, SubscriberSlot, _scopes, on, use  # noqa: F401
+from .publisher import Publisher, _partitioned, _publishers, define, gather, get_publishers
+from .scope import Scope, SubscriberSlot, _listeners, _scopes, on, use  # noqa: F401
 from .subscriber import Subscriber
-from .utils import Force, Result, Resultable, add_task
+from .utils import Force, Limiter, Result, Resultable, _EventSystem, add_task
 
 T = TypeVar("T")
 
@@ -46,34 +48,65 @@ exc_pub = define(ExceptionEvent, name="internal/exception")
 def publish_exc_event(event: ExceptionEvent):
     if isinstance(event.origin, ExceptionEvent) or isinstance(event.exception, _ExitException):  # pragma: no cover
         return
-    scopes = [sp for sp in _scopes.values() if sp.available]
-    subs = [slot for sp in scopes for slot in sp.subscribers if slot.publisher_id != "$backend"]
+    pubs = get_publishers(event)
+    subs = [slot for sp in _scopes.values() if sp.available for slot in sp.ordered(pubs, pass_backend=False)]
     return add_task(dispatch(event, slots=subs))
 
 
-async def compute(event: Any, scope: str | Scope | None = None, slots: Iterable[SubscriberSlot] | None = None, inherit_ctx: Contexts | None = None) -> tuple[defaultdict[tuple[int, str], list[Subscriber]], dict[str, Contexts]]:
-    """准备事件处理的公共逻辑"""
-    if slots:
-        pass
-    elif isinstance(scope, str) and (sp := _scopes.get(scope)):
-        slots = sp.subscribers if sp.available else []
-    elif isinstance(scope, Scope):
-        slots = scope.subscribers if scope.available else []
-    else:
-        slots = chain.from_iterable(sp.subscribers for sp in _scopes.values() if sp.available)
+_plans: dict[tuple[Scope | None, frozenset[str]], dict[tuple[int, str], list[Subscriber]]] = {}
+_plans_version = -1
 
-    context_map: dict[str, Contexts] = {}
 
-    pubs = get_publishers(event)
+def _group(slots: Iterable[SubscriberSlot]) -> dict[tuple[int, str], list[Subscriber]]:
+    """按优先级与发布者对已排序的订阅者槽位进行分组"""
     grouped: defaultdict[tuple[int, str], list[Subscriber]] = defaultdict(list)
+    for slot in slots:
+        grouped[(slot.priority, slot.publisher_id)].append(slot.subscriber)
+    return dict(grouped)
+
+
+def _make_plan(slots: Iterable[SubscriberSlot], pubs: dict[str, Publisher]) -> dict[tuple[int, str], list[Subscriber]]:
+    return _group(
+        slot for slot in sorted(slots, key=attrgetter("priority"))
+        if slot.publisher_id == "$backend" or slot.publisher_id in pubs
+    )
+
+
+def get_plan(pubs: dict[str, Publisher], scope: str | Scope | None = None) -> dict[tuple[int, str], list[Subscriber]]:
+    """获取分发计划；计划按作用域与发布者缓存，注册表变更后失效"""
+    global _plans_version
 
-    for slot in sorted(slots, key=attrgetter("priority")):
-        pub_id = slot.publisher_id
-        if pub_id != "$backend" and pub_id not in pubs:
+    if _plans_version != _EventSystem.version:
+        _plans.clear()
+        _plans_version = _EventSystem.version
+    if isinstance(scope, str):
+        scope = _scopes.get(scope)
+    key = (scope, frozenset(pubs))
+    if (plan := _plans.get(key)) is not None:
+        return plan
+    scopes = [sp for sp in _scopes.values() if sp.available] if scope is None else [scope] if scope.available else []
+    plan = _plans[key] = _group(merge(*(sp.ordered(pubs) for sp in scopes), key=attrgetter("priority")))
+    return plan
+
+
+async def compute(event: Any, scope: str | Scope | None = None, slots: Iterable[SubscriberSlot] | None = None, inherit_ctx: Contexts | None = None) -> tuple[dict[tuple[int, str], list[Subscriber]], dict[str, Contexts]]:
+    """准备事件处理的公共逻辑"""
+    pubs = get_publishers(event)
+    grouped = _make_plan(slots, pubs) if slots else get_plan(pubs, scope)
+
+    context_map: dict[str, Contexts] = {}
+    base: Contexts | None = None
+    shared: dict[str, Any] = {}
+    for _, pub_id in grouped:
+        if pub_id in context_map:
             continue
-        if pub_id not in context_map:
-            context_map[pub_id] = await generate_contexts(event, None if pub_id == "$backend" else pubs[pub_id].supplier, inherit_ctx)
-        grouped[(slot.priority, pub_id)].append(slot.subscriber)
+        if base is None:
+            base, shared = await generate_base_contexts(event, inherit_ctx)
+        context_map[pub_id] = await overlay_contexts(base, shared, event, None if pub_id == "$backend" else pubs[pub_id].supplier)
+    if inherit_ctx is not None:
+        # 与逐个发布者生成上下文时相同，将生成的内容写回调用方传入的上下文
+        for contexts in context_map.values():
+            inherit_ctx.update(contexts.flatten() if isinstance(contexts, LayeredContexts) else contexts)
 
     return grouped, context_map
 
@@ -83,7 +116,7 @@ async def dispatch(event: Any, scope: str | Scope | None = None, slots: Iterable
 
     for key, subs in grouped.items():
         contexts = context_map[key[1]]
-        tasks = [subscriber.handle(contexts.copy()) for subscriber in subs]
+        tasks = [subscriber.handle(LayeredContexts(contexts)) for subscriber in subs]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         for _i, result in enumerate(results):
             if result is None or result is STOP:
@@ -107,13 +140,13 @@ async def dispatch(event: Any, scope: str | Scope | None = None, slots: Iterable
 async def serial_exec(subs: list[Subscriber], ctx: Contexts):
     for subscriber in subs:
         try:
-            yield subscriber, await subscriber.handle(ctx.copy())
+            yield subscriber, await subscriber.handle(LayeredContexts(ctx))
         except BaseException as e:
             yield subscriber, e
 
 
 async def serial_exec_concurrent(subs: list[Subscriber], ctx: Contexts):
-    pending = {asyncio.create_task(subscriber.handle(ctx.copy()), name=f"sub_{i}") for i, subscriber in enumerate(subs)}
+    pending = {asyncio.create_task(subscriber.handle(LayeredContexts(ctx)), name=f"sub_{i}") for i, subscriber in enumerate(subs)}
     while pending:
         done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
         for task in done:
@@ -211,32 +244,215 @@ async def run_handler(
     return await _target.handle(contexts)
 
 
-def setup_fetch():
-    for pub in _publishers.values():
-        add_task(_loop_fetch(pub))
+def setup_fetch(workers: int | None = None, batch_size: int = 64) -> list[asyncio.Task]:
+    """为每个 Publisher 启动事件队列的消费者
 
+    消费者在队列为空时挂起，有新事件时被唤醒并一次取出至多 `batch_size` 个事件依次分发；
+    `workers` 为每个 Publisher 的消费者数量，未指定时使用 `Publisher.fetch_workers`
+    """
+    return [add_task(_loop_fetch(pub, batch_size)) for pub in list(_publishers.values()) for _ in range(workers or pub.fetch_workers)]
 
-async def _loop_fetch(publisher: Publisher):
+
+async def _loop_fetch(publisher: Publisher, batch_size: int = 64):
+    queue = publisher.event_queue
     while True:
-        if not (event := (await publisher.supply())):  # pragma: no cover
-            await asyncio.sleep(0.05)
-            continue
-        await publish(event)
-        await asyncio.sleep(0.05)
+        for event in await publisher.supply_batch(batch_size):
+            try:
+                if event:
+                    # 与 publish_wait 相同：经过订阅者计数、准入控制与在途限制，并进入分区通道
+                    await (await publish_wait(event))
+            except Exception as e:
+                # 单个事件的失败不应终止消费者
+                if ExceptionHandler.print_traceback:
+                    traceback.print_exception(e)
+            finally:
+                queue.task_done()
+
+
+def _limiters(scope: str | Scope | None) -> tuple[Limiter, ...]:
+    if isinstance(scope, str):
+        scope = _scopes.get(scope)
+    if scope is None:
+        return (_EventSystem.limiter,)
+    return _EventSystem.limiter, scope.limiter
+
+
+class _Lane:
+    __slots__ = ("queue", "task")
+
+    def __init__(self):
+        self.queue: asyncio.Queue[tuple[Callable[[], Awaitable[Any]], asyncio.Future]] = asyncio.Queue()
+        self.task: asyncio.Task | None = None
+
+
+_lanes: dict[str, dict[int, _Lane]] = {}
 
 
-def publish(event: Any, scope: str | Scope | None = None, inherit_ctx: Contexts | None = None) -> asyncio.Task[None]:
-    """发布事件，并行处理所有响应"""
-    return add_task(dispatch(event, scope, inherit_ctx=inherit_ctx))
+def _cancel_job(job: asyncio.Task[Any], fut: asyncio.Future[Any]):
+    if fut.cancelled():
+        job.cancel()
+
+
+async def _run_lane(lanes: dict[int, _Lane], index: int, lane: _Lane, idle: float):
+    queue = lane.queue
+    loop = asyncio.get_running_loop()
+    current: asyncio.Task[Any] | None = None
+    try:
+        while True:
+            try:
+                job, fut = await asyncio.wait_for(queue.get(), idle)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    return
+                continue
+            if fut.done():
+                # 开始前已被取消
+                continue
+            current = loop.create_task(job())
+            fut.add_done_callback(partial(_cancel_job, current))
+            await asyncio.wait((current,))
+            if not fut.done():
+                if current.cancelled():
+                    fut.cancel()
+                elif (exc := current.exception()) is not None:
+                    fut.set_exception(exc)
+                else:
+                    fut.set_result(current.result())
+            current = None
+    finally:
+        # 通道因空闲、被取消或出错而结束时移出通道表，并取消仍在排队的分发，使其归还在途名额
+        if lanes.get(index) is lane:
+            del lanes[index]
+        if current is not None:
+            current.cancel()
+            fut.cancel()  # type: ignore
+        while not queue.empty():
+            queue.get_nowait()[1].cancel()
+
+
+def _partition(event: Any, job: Callable[[], Coroutine[Any, Any, T]]) -> asyncio.Future[T] | None:
+    """若事件属于设置了分区键的 Publisher，将分发放入对应的串行通道
+
+    返回在分发完成时结束的 Future 而非 Task：取消它会跳过尚未开始的分发，或取消正在进行的分发
+    """
+    pub = next((pub for pub in get_publishers(event).values() if pub.partition_key), None)
+    if not pub:
+        return None
+    lanes = _lanes.setdefault(pub.id, {})
+    index = hash(pub.partition_key(event)) % pub.max_lanes  # type: ignore
+    if (lane := lanes.get(index)) is None:
+        lanes[index] = lane = _Lane()
+        lane.task = add_task(_run_lane(lanes, index, lane, pub.lane_idle))
+    fut = (_EventSystem.loop or asyncio.get_running_loop()).create_future()
+    lane.queue.put_nowait((job, fut))
+    return fut
+
+
+def _spawn(event: Any, job: Callable[[], Coroutine[Any, Any, T]], limiters: tuple[Limiter, ...]) -> asyncio.Future[T]:
+    """创建分发任务，或放入事件所属的串行通道；任务结束时归还占用的名额
+
+    进入串行通道时返回的是 Future 而非 Task，见 `_partition`
+    """
+    task: asyncio.Future[T] | None = None
+    if _partitioned:
+        task = _partition(event, job)
+    if task is None:
+        task = add_task(job())
+    task.add_done_callback(lambda _: [limiter.release() for limiter in limiters])
+    return task
+
+
+def _unheard(event: Any, scope: str | Scope | None) -> bool:
+    """依据订阅者计数判断是否没有任何可用的订阅者可能响应该事件"""
+    if isinstance(scope, str):
+        scope = _scopes.get(scope)
+    if scope is None:
+        if not _listeners:
+            return True
+        if "$backend" in _listeners:
+            return False
+        return not any(pub_id in _listeners for pub_id in get_publishers(event))
+    if not scope.available:
+        return True
+    index = scope._index
+    if index["$backend"]:
+        return False
+    return not any(pub_id in index for pub_id in get_publishers(event))
+
+
+def _shed() -> asyncio.Future[Any]:
+    """被准入控制丢弃或无人订阅的事件返回一个已完成、结果为 None 的 Future，每次调用都是新的 Future"""
+    fut = (_EventSystem.loop or asyncio.get_running_loop()).create_future()
+    fut.set_result(None)
+    return fut
+
+
+def publish(event: Any, scope: str | Scope | None = None, inherit_ctx: Contexts | None = None) -> asyncio.Future[None]:
+    """发布事件，并行处理所有响应
+
+    返回在分发完成时结束的 Future；事件无人订阅或被准入控制丢弃时为一个已完成、结果为 None 的 Future
+    """
+    if _unheard(event, scope):
+        return _shed()
+    if (admission := _EventSystem.admission) and not admission.admit(event):
+        return _shed()
+    limiters = _limiters(scope)
+    for limiter in limiters:
+        limiter.hold()
+    return _spawn(event, partial(dispatch, event, scope, inherit_ctx=inherit_ctx), limiters)
+
+
+async def publish_wait(event: Any, scope: str | Scope | None = None, inherit_ctx: Contexts | None = None) -> asyncio.Future[None]:
+    """发布事件，在途事件数达到上限时等待名额空出，以此向生产者施加背压
+
+    返回的任务与 `publish` 相同
+    """
+    if _unheard(event, scope):
+        return _shed()
+    if (admission := _EventSystem.admission) and not admission.admit(event):
+        return _shed()
+    limiters = _limiters(scope)
+    acquired: list[Limiter] = []
+    try:
+        for limiter in limiters:
+            await limiter.acquire()
+            acquired.append(limiter)
+    except BaseException:
+        for limiter in acquired:
+            limiter.release()
+        raise
+    return _spawn(event, partial(dispatch, event, scope, inherit_ctx=inherit_ctx), limiters)
+
+
+def try_publish(event: Any, scope: str | Scope | None = None, inherit_ctx: Contexts | None = None) -> asyncio.Future[None] | None:
+    """发布事件，在途事件数达到上限或被准入控制丢弃时不等待，直接返回 None 表示事件被拒绝"""
+    if _unheard(event, scope):
+        return _shed()
+    if (admission := _EventSystem.admission) and not admission.admit(event):
+        return None
+    limiters = _limiters(scope)
+    for i, limiter in enumerate(limiters):
+        if not limiter.try_acquire():
+            for acquired in limiters[:i]:
+                acquired.release()
+            return None
+    return _spawn(event, partial(dispatch, event, scope, inherit_ctx=inherit_ctx), limiters)
 
 
 @overload
-def post(event: Resultable[T], scope: str | Scope | None = None, inherit_ctx: Contexts | None = None, validate: bool = False) -> asyncio.Task[Result[T] | None]: ...
+def post(event: Resultable[T], scope: str | Scope | None = None, inherit_ctx: Contexts | None = None, validate: bool = False) -> asyncio.Future[Result[T] | None]: ...
 @overload
-def post(event: Any, scope: str | Scope | None = None, inherit_ctx: Contexts | None = None, validate: bool = False) -> asyncio.Task[Result[Any] | None]: ...
+def post(event: Any, scope: str | Scope | None = None, inherit_ctx: Contexts | None = None, validate: bool = False) -> asyncio.Future[Result[Any] | None]: ...
 def post(event: Any, scope: str | Scope | None = None, inherit_ctx: Contexts | None = None, validate: bool = False):
     """发布事件，并行处理所有响应并返回第一个响应结果"""
-    return add_task(_post(event, scope, inherit_ctx=inherit_ctx, validate=validate))
+    if _unheard(event, scope):
+        return _shed()
+    if (admission := _EventSystem.admission) and not admission.admit(event):
+        return _shed()
+    limiters = _limiters(scope)
+    for limiter in limiters:
+        limiter.hold()
+    return _spawn(event, partial(_post, event, scope, inherit_ctx=inherit_ctx, validate=validate), limiters)
 
 
 @overload
@@ -275,9 +491,14 @@ def make_event(cls: type[C] | None = None, *, name: str | None = None, **kwargs)
     def wrapper(_cls: type[C], /):
         _cls = dataclass(**kwargs)(_cls)
         annotation = {k: v for c in reversed(_cls.__mro__[:-1]) for k, v in getattr(c, "__annotations__", {}).items()}
+        fields = tuple(key for key in annotation if key != "providers")
+        getter = attrgetter(*fields) if len(fields) > 1 else (lambda x: (getattr(x, fields[0]),)) if fields else (lambda x: ())
 
         async def _gather(self: C, ctx: Contexts):
-            return ctx.update({key: getattr(self, key, None) for key in annotation if key != "providers"})
+            try:
+                return ctx.update(zip(fields, getter(self)))
+            except AttributeError:  # pragma: no cover
+                return ctx.update({key: getattr(self, key, None) for key in fields})
 
         id_ = name or f"$event:{_cls.__module__}.{_cls.__name__}"
         parent_publisher = {getattr(c, "__publisher__", None) for c in _cls.__mro__[1:-1]}
@@ -286,6 +507,7 @@ def make_event(cls: type[C] | None = None, *, name: str | None = None, **kwargs)
         pub = Publisher(_cls, id_=id_, supplier=_gather)
         _cls.__publisher__ = pub.id  # type: ignore
         _cls.__context_gather__ = pub.supplier  # type: ignore
+        _cls.__event_fields__ = {key: annotation[key] for key in fields}  # type: ignore
         return _cls  # type: ignore
 
     if cls is None:
@@ -4,12 +4,11 @@ from typing import TYPE_CHECKING, Any, Union, overload
 from typing_extensions import Self
 
 from tarina import is_coroutinefunction
-from tarina.tools import run_sync
 
 from .context import EVENT, Contexts
 from .provider import Provider
 from .ref import Deref, generate
-from .subscriber import STOP, Propagator, Subscriber, _compile
+from .subscriber import STOP, Propagator, Subscriber
 from .utils import TCallable
 
 
@@ -19,7 +18,7 @@ def bind(*args: Provider | type[Provider]):
     def wrapper(target: TCallable) -> TCallable:
         if isinstance(target, Subscriber):  # pragma: no cover
             target.providers.extend(providers)
-            target.params = _compile(target.callable_target, target.providers)
+            target._recompile()
         else:
             _providers = getattr(target, "__providers__", [])
             setattr(target, "__providers__", _providers + providers)
@@ -74,12 +73,20 @@ class Check(Propagator):
 
     def checkers(self):
         for predicate in self.predicates:
-            func = predicate if is_coroutinefunction(predicate) else run_sync(predicate)
+            # 同步谓词保持同步，由所属订阅者的执行方式决定内联或交由线程池执行
+            if is_coroutinefunction(predicate):
 
-            @wraps(predicate)
-            async def check(*args, _func=func, **kwargs):
-                if await _func(*args, **kwargs) is not self.result:
-                    return STOP
+                @wraps(predicate)
+                async def check(*args, _func=predicate, **kwargs):
+                    if await _func(*args, **kwargs) is not self.result:
+                        return STOP
+
+            else:
+
+                @wraps(predicate)
+                def check(*args, _func=predicate, **kwargs):
+                    if _func(*args, **kwargs) is not self.result:
+                        return STOP
 
             yield check, True, self.priority
 
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import threading
+import time
+from collections.abc import AsyncGenerator, Callable, Coroutine, Generator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial, wraps
+from typing import Any, TypeVar
+from typing_extensions import ParamSpec
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+
+@dataclass(slots=True, frozen=True)
+class ExecutorStats:
+    """执行器的运行统计"""
+
+    max_workers: int
+    """工作者数量上限"""
+    queued: int
+    """已提交但尚未开始执行的任务数，即队列深度"""
+    running: int
+    """正在执行的任务数"""
+    completed: int
+    """已完成的任务数"""
+    utilization: float
+    """自创建以来工作者的平均占用率，取值为 0 到 1"""
+
+
+class MonitoredExecutor(Executor):
+    """为 `Executor` 附加队列深度与占用率统计的包装
+
+    执行器按先进先出调度任务，因此任务数超出工作者数量的部分即为排队数；
+    占用率由在途任务数对时间积分得出，线程池与进程池均适用。
+    """
+
+    def __init__(self, executor: Executor, max_workers: int | None = None):
+        self.executor = executor
+        self.max_workers = max_workers or getattr(executor, "_max_workers", 1)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._busy = 0.0
+        self._created = self._last = time.monotonic()
+
+    def _advance(self, delta: int):
+        with self._lock:
+            now = time.monotonic()
+            self._busy += min(self._in_flight, self.max_workers) * (now - self._last)
+            self._last = now
+            self._in_flight += delta
+            if delta < 0:
+                self._completed += 1
+
+    def _done(self, _: Future):
+        self._advance(-1)
+
+    def submit(self, fn: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> Future[T]:
+        self._advance(1)
+        try:
+            fut = self.executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        fut.add_done_callback(self._done)
+        return fut
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.executor.shutdown(wait, cancel_futures=cancel_futures)
+
+    def stats(self) -> ExecutorStats:
+        self._advance(0)
+        with self._lock:
+            in_flight = self._in_flight
+            elapsed = self._last - self._created
+            utilization = self._busy / (self.max_workers * elapsed) if elapsed > 0 else 0.0
+            return ExecutorStats(
+                self.max_workers,
+                max(in_flight - self.max_workers, 0),
+                min(in_flight, self.max_workers),
+                self._completed,
+                utilization,
+            )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.executor!r}, max_workers={self.max_workers})"
+
+
+def thread_pool(max_workers: int | None = None, thread_name_prefix: str = "") -> MonitoredExecutor:
+    """创建一个带统计的专用线程池"""
+    executor = ThreadPoolExecutor(max_workers, thread_name_prefix)
+    return MonitoredExecutor(executor, executor._max_workers)
+
+
+def process_pool(max_workers: int | None = None) -> MonitoredExecutor:
+    """创建一个带统计的专用进程池"""
+    executor = ProcessPoolExecutor(max_workers)
+    return MonitoredExecutor(executor, executor._max_workers)
+
+
+_process_pool: MonitoredExecutor | None = None
+
+
+def default_process_pool(max_workers: int | None = None) -> MonitoredExecutor:
+    """获取 `executor="process"` 所使用的共享进程池
+
+    进程池在首次调用时创建，`max_workers` 仅在此时生效
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = process_pool(max_workers)
+    return _process_pool
+
+
+def is_process_executor(executor: Any) -> bool:
+    """判断执行方式是否会将调用发送至其他进程"""
+    if executor == "process":
+        return True
+    if isinstance(executor, MonitoredExecutor):
+        executor = executor.executor
+    return isinstance(executor, ProcessPoolExecutor)
+
+
+@lru_cache(None)
+def _resolve(module: str, qualname: str) -> Callable[..., Any]:
+    obj: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    # 模块中的名字可能已被注册为 Subscriber，此时取回原函数
+    return getattr(obj, "callable_target", obj)
+
+
+class ProcessTarget:
+    """以模块路径引用同步函数，使其能够被发送至工作进程
+
+    被 `on` 等装饰后，模块中的同名属性是 Subscriber 而非原函数，无法直接按引用序列化；
+    工作进程中按路径导入后再取回原函数。
+    """
+
+    __slots__ = ("module", "qualname")
+
+    def __init__(self, func: Callable[..., Any]):
+        qualname = getattr(func, "__qualname__", "")
+        if not qualname or "<locals>" in qualname or "<lambda>" in qualname:
+            raise TypeError(f"{func!r} is not importable by path and can't be run in a process pool")
+        self.module = func.__module__
+        self.qualname = qualname
+
+    def __call__(self, *args, **kwargs):
+        return _resolve(self.module, self.qualname)(*args, **kwargs)
+
+    def __getstate__(self):
+        return self.module, self.qualname
+
+    def __setstate__(self, state):
+        self.module, self.qualname = state
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.module}:{self.qualname})"
+
+
+def run_in_process(call: Callable[P, T], executor: Executor | None = None) -> Callable[P, Coroutine[None, None, T]]:
+    """将同步函数包装为交由进程池执行的异步函数
+
+    仅有调用参数与返回值在进程间传递；未指定执行器时使用 `default_process_pool`
+    """
+    target = ProcessTarget(call)
+
+    @wraps(call)
+    async def _wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or default_process_pool(), partial(target, *args, **kwargs))
+
+    return _wrapper
+
+
+def run_in_executor(executor: Executor, call: Callable[P, T]) -> Callable[P, Coroutine[None, None, T]]:
+    """将同步函数包装为交由指定执行器执行的异步函数"""
+
+    @wraps(call)
+    async def _wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(call, *args, **kwargs))
+
+    return _wrapper
+
+
+def _next(it: Generator[T, Any, Any]) -> tuple[bool, T | None]:
+    try:
+        return False, next(it)
+    except StopIteration:
+        return True, None
+
+
+def run_in_executor_generator(executor: Executor, call: Callable[P, Generator[T, Any, Any]]) -> Callable[P, AsyncGenerator[T, None]]:
+    """将同步生成器函数包装为异步生成器函数，每一步迭代交由指定执行器执行"""
+
+    @wraps(call)
+    async def _wrapper(*args: P.args, **kwargs: P.kwargs) -> AsyncGenerator[T, None]:
+        loop = asyncio.get_running_loop()
+        gen = await loop.run_in_executor(executor, partial(call, *args, **kwargs))
+        while True:
+            stop, item = await loop.run_in_executor(executor, _next, gen)
+            if stop:
+                return
+            yield item  # type: ignore
+
+    return _wrapper
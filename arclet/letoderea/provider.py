@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import inspect
 from abc import ABCMeta, abstractmethod
-from collections.abc import Awaitable, Callable, Sequence
+from collections.abc import Awaitable, Callable, Iterator, Sequence
 from contextlib import AsyncExitStack
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Any, ClassVar, Generic, TypeAlias, TypeVar, cast
+from heapq import merge
+from typing import Any, ClassVar, Generic, TypeAlias, TypeVar
 from typing_extensions import TypeForm
 
 from tarina import generic_issubclass
@@ -31,6 +32,13 @@ class Param:
 @dataclass(init=False, repr=True)
 class Provider(Generic[T], metaclass=ABCMeta):
     priority: ClassVar[int] = 20
+    names: ClassVar[frozenset[str] | None] = None
+    """若不为空，`validate` 只会对这些名称的参数通过，编译时仅对同名参数校验该 Provider"""
+    cacheable: ClassVar[bool] = False
+    """`validate` 的结果是否只取决于参数名与注解；为真时校验结果按 (参数名, 注解) 缓存
+
+    `validate` 还可能依赖参数的默认值或已有的 Provider，因此默认不缓存，需要由 Provider 自行声明
+    """
     origin: type[T]
 
     def __init__(self):
@@ -56,6 +64,50 @@ class Provider(Generic[T], metaclass=ABCMeta):
         raise NotImplementedError
 
 
+class FunctionalProvider(Provider[Any]):
+    """由 `provide` 生成的 Provider
+
+    来源类型、目标参数名、提供方式与优先级均保存在实例上，生成时无需创建新的类。
+    """
+
+    def __init__(
+        self,
+        origin: Any,
+        target: str | None = None,
+        call: Callable[[Contexts], Any] | str | None = None,
+        validate: Callable[[Param], bool] | None = None,
+        priority: int = 20,
+        _id: str = "_Provider",
+    ):
+        if not call and not target:
+            raise ValueError("Either `call` or `target` must be provided")
+        self.origin = origin
+        self.target = target
+        self.call = call
+        self.validator = validate
+        self.priority = priority  # type: ignore
+        self.names = frozenset((target,)) if target and not validate else None  # type: ignore
+        # 自定义的 validate 可能依赖参数的其他信息，不缓存其结果
+        self.cacheable = validate is None  # type: ignore
+        self._id = _id
+        self._key = target if not call else call if isinstance(call, str) else None
+
+    def validate(self, param: Param):
+        if self.validator:
+            return self.validator(param)
+        if param.annotation:
+            return super().validate(param) and (not self.target or param.name == self.target)
+        return param.name == self.target
+
+    async def __call__(self, context: Contexts):
+        if self._key is not None:
+            return context.get(self._key)
+        return await run_always_await(self.call, context)  # type: ignore
+
+    def __repr__(self):
+        return f"{self._id.title()}(origin={self.origin}{(', target=' + repr(self.target)) if self.target else ''})"
+
+
 def provide(
     origin: TypeForm[T],
     target: str | None = None,
@@ -67,51 +119,119 @@ def provide(
     """
     用于动态生成 Provider 的装饰器
     """
-    origin = cast(type[T], origin)
-
-    if not call and not target:
-        raise ValueError("Either `call` or `target` must be provided")
-
-    class _Provider(Provider[origin]):  # type: ignore  # noqa
-        def validate(self, param: Param):
-            if validate:
-                return validate(param)
-            if param.annotation:
-                return super().validate(param) and (not target or param.name == target)
-            return param.name == target
-
-        async def __call__(self, context: Contexts):
-            if not call and target:
-                return context.get(target)
-            if isinstance(call, str):
-                return context.get(call)
-            return await run_always_await(call, context)  # type: ignore
-
-        def __repr__(self):
-            return f"{_id.title()}(origin={origin}{(', target=' + repr(target)) if target else ''})"
-
-    _Provider.priority = priority
-    return type(_id, (_Provider,), {})()
+    return FunctionalProvider(origin, target, call, validate, priority, _id)
 
 
 class ProviderFactory(metaclass=ABCMeta):
+    names: ClassVar[frozenset[str] | None] = None
+    """同 `Provider.names`"""
+    cacheable: ClassVar[bool] = False
+    """同 `Provider.cacheable`；为真时分配的 Provider 也会在同名同注解的参数间共用"""
+
     @abstractmethod
     def validate(self, param: Param) -> Provider | None:
         """依据参数类型自行分配对应 Provider"""
 
 
+_MISSING = object()
+
+
+def check_provider(provider: Provider | ProviderFactory, param: Param) -> Provider | None:
+    """校验 Provider 或 ProviderFactory 能否用于该参数，返回可用的 Provider"""
+    memo = key = None
+    if provider.cacheable:
+        try:
+            key = (param.name, param.annotation)
+            hash(key)
+            if (memo := provider.__dict__.get("_validated")) is None:
+                memo = provider.__dict__["_validated"] = {}
+        except (TypeError, AttributeError):
+            memo = None
+        else:
+            if (res := memo.get(key, _MISSING)) is not _MISSING:
+                return res
+    if isinstance(provider, ProviderFactory):
+        res = provider.validate(param)
+    else:
+        res = provider if provider.validate(param) else None
+    if memo is not None:
+        memo[key] = res
+    return res
+
+
+class ProviderRegistry:
+    """按参数名索引的 Provider 候选表
+
+    声明了 `names` 的 Provider 只作为同名参数的候选，其余的作为所有参数的候选；候选保持原有顺序。
+    候选均可缓存时，每个 (参数名, 注解) 的匹配结果也会被缓存
+    """
+
+    __slots__ = ("providers", "named", "common", "resolved")
+
+    def __init__(self, providers: Sequence[Provider | ProviderFactory]):
+        self.providers = list(providers)
+        self.named: dict[str, list[int]] = {}
+        self.common: list[int] = []
+        self.resolved: dict[tuple[str, Any], list[Provider]] = {}
+        for index, provider in enumerate(self.providers):
+            if (names := provider.names) is None:
+                self.common.append(index)
+            else:
+                for name in names:
+                    self.named.setdefault(name, []).append(index)
+
+    def candidates(self, name: str) -> Iterator[Provider | ProviderFactory]:
+        named = self.named.get(name)
+        indices = merge(named, self.common) if named else self.common
+        return map(self.providers.__getitem__, indices)
+
+    def resolve(self, param: Param) -> None:
+        """将可用于该参数的 Provider 依次加入 `param.providers`"""
+        key: tuple[str, Any] | None = (param.name, param.annotation)
+        try:
+            cached = self.resolved.get(key)  # type: ignore
+        except TypeError:
+            key = cached = None
+        if cached is not None:
+            param.providers.extend(cached)
+            return
+        start = len(param.providers)
+        pure = True
+        for provider in self.candidates(param.name):
+            pure = pure and provider.cacheable
+            if res := check_provider(provider, param):
+                param.providers.append(res)
+        if key is not None and pure:
+            self.resolved[key] = param.providers[start:]
+
+
+_registries: dict[tuple[int, ...], ProviderRegistry] = {}
+
+
+def get_registry(providers: Sequence[Provider | ProviderFactory]) -> ProviderRegistry:
+    """获取给定 Provider 列表的候选表；候选表按列表内容缓存"""
+    key = tuple(map(id, providers))
+    if (registry := _registries.get(key)) is None:
+        if len(_registries) >= 256:
+            _registries.clear()
+        registry = _registries[key] = ProviderRegistry(providers)
+    return registry
+
+
 @lru_cache
 def get_providers(event: Any) -> list[Provider[Any] | ProviderFactory]:
     res = [p for cls in reversed(event.__mro__[:-1]) for p in getattr(cls, "providers", [])]  # type: ignore
     res.extend(p for _, p in inspect.getmembers(event, lambda x: inspect.isclass(x) and issubclass(x, (Provider, ProviderFactory))))
     providers = [p() if isinstance(p, type) else p for p in res]
-    return list({p.__class__: p for p in providers}.values())
+    # 同类的 Provider 只保留一个；`provide` 生成的 Provider 共用一个类，按实例区分
+    return list({id(p) if p.__class__ is FunctionalProvider else p.__class__: p for p in providers}.values())
 
 
 global_providers: list[Provider | ProviderFactory | type[Provider] | type[ProviderFactory]] = []
 
 
 class EventProvider(Provider[Any]):
+    cacheable = True
     EVENT_CLASS: ClassVar[type | None] = None
 
     def validate(self, param: Param):
@@ -126,6 +246,7 @@ class EventProvider(Provider[Any]):
 
 
 class ContextProvider(Provider[Contexts]):
+    cacheable = True
     def validate(self, param: Param):
         return param.annotation is Contexts or is_optional(param.annotation, Contexts)
 
@@ -134,6 +255,7 @@ class ContextProvider(Provider[Contexts]):
 
 
 class AsyncExitStackProvider(Provider[AsyncExitStack]):
+    cacheable = True
     def validate(self, param: Param):
         return param.annotation is AsyncExitStack or is_optional(param.annotation, AsyncExitStack)
 
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-from asyncio import Queue
-from collections.abc import Awaitable, Callable
-from typing import TYPE_CHECKING, Any, Generic, TypeVar, get_type_hints, overload
+from asyncio import Queue, QueueFull
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeVar, get_type_hints, overload
 from typing_extensions import Self
 
 from tarina.generic import generic_isinstance, is_typed_dict
 
 from .context import Contexts
 from .provider import Provider, ProviderFactory, get_providers
+from .utils import bump_version
 
 if TYPE_CHECKING:
     from .subscriber import Subscriber
@@ -19,6 +20,7 @@ _publishers: dict[str, Publisher] = {}
 _custom_validates: set[str] = set()
 _static_validates: set[str] = set()
 _publisher_cache: dict[type, list[str]] = {}
+_partitioned: set[str] = set()
 
 
 async def _supplier(event: Any, context: Contexts):
@@ -31,7 +33,7 @@ class Publisher(Generic[T]):
     id: str
     validate: Callable[[Any], bool]
 
-    def __init__(self, target: type[T], id_: str | None = None, supplier: Callable[[T, Contexts], Awaitable[Contexts | None]] | None = None, validator: Callable[[T], bool] | None = None, queue_size: int = -1):
+    def __init__(self, target: type[T], id_: str | None = None, supplier: Callable[[T, Contexts], Awaitable[Contexts | None]] | None = None, validator: Callable[[T], bool] | None = None, queue_size: int = -1, fetch_workers: int = 1, priority: int = 16, overflow: Literal["block", "drop_oldest", "drop_newest"] = "block", partition_key: Callable[[T], Hashable] | None = None, max_lanes: int = 64, lane_idle: float = 30.0):
         self.providers: list[Provider | ProviderFactory] = get_providers(target)
         if not isinstance(target, type) and not id_:  # pragma: no cover
             raise TypeError("Publisher with generic type must have a name")
@@ -41,6 +43,20 @@ class Publisher(Generic[T]):
         if hasattr(target, "gather"):
             self.supplier = target.gather  # type: ignore
         self.event_queue = Queue(queue_size)
+        self.fetch_workers = fetch_workers
+        """消费事件队列的并发消费者数量"""
+        self.priority = priority
+        """过载时的准入优先级，数值越小越重要"""
+        self.overflow = overflow
+        """事件队列已满时的策略：阻塞等待、丢弃最旧的事件或丢弃新事件"""
+        self.shed = 0
+        """因过载或队列溢出而被丢弃的事件数"""
+        self.partition_key = partition_key
+        """分区键，设置后同一键的事件经由同一条串行通道依次分发"""
+        self.max_lanes = max_lanes
+        """串行通道的数量上限，分区键按哈希映射到通道上"""
+        self.lane_idle = lane_idle
+        """通道空闲超过该秒数后被回收"""
         basic_validate = (
             (lambda x: generic_isinstance(x, target))
             if is_typed_dict(target) or not isinstance(target, type)
@@ -55,6 +71,8 @@ class Publisher(Generic[T]):
         else:
             _custom_validates.add(self.id)
         _publishers[self.id] = self
+        if partition_key:
+            _partitioned.add(self.id)
 
     def gather(self, func: Callable[[T, Contexts], Awaitable[Contexts | None]]):
         self.supplier = func
@@ -64,19 +82,41 @@ class Publisher(Generic[T]):
         return f"{self.__class__.__name__}::{self.id}"
 
     def unsafe_push(self: Publisher[T1], event: T1) -> None:
-        """将事件放入队列，等待被 event system 主动轮询; 该方法可能引发 QueueFull 异常"""
-        self.event_queue.put_nowait(event)
+        """将事件放入队列，等待被 event system 主动轮询; 溢出策略为 `block` 时可能引发 QueueFull 异常"""
+        try:
+            self.event_queue.put_nowait(event)
+        except QueueFull:
+            if self.overflow == "block":
+                raise
+            self.shed += 1
+            if self.overflow == "drop_oldest":
+                self.event_queue.get_nowait()
+                self.event_queue.task_done()
+                self.event_queue.put_nowait(event)
 
     async def push(self: Publisher[T1], event: T1):
-        """将事件放入队列，等待被 event system 主动轮询"""
-        await self.event_queue.put(event)
+        """将事件放入队列，等待被 event system 主动轮询; 溢出策略不为 `block` 时不会等待"""
+        if self.overflow == "block":
+            await self.event_queue.put(event)
+        else:
+            self.unsafe_push(event)
 
     async def supply(self) -> T:
         """被动提供事件方法， 由 event system 主动轮询"""
         return await self.event_queue.get()
 
+    async def supply_batch(self, max_size: int = 64) -> list[T]:
+        """等待队列中出现事件，随后一次取出至多 `max_size` 个事件"""
+        batch = [await self.event_queue.get()]
+        while len(batch) < max_size and not self.event_queue.empty():
+            batch.append(self.event_queue.get_nowait())
+        return batch
+
     def dispose(self):
         _publishers.pop(self.id, None)
+        _partitioned.discard(self.id)
+        _publisher_cache.clear()
+        bump_version()
 
     def check(self: Self, func: Callable[[Self, Subscriber], bool]):
         self.check_subscriber = func.__get__(self)  # type: ignore
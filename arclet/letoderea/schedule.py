@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+import traceback
+from collections.abc import Callable
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from .core import publish
+from .exceptions import ExceptionHandler
+from .utils import add_task
+
+if TYPE_CHECKING:
+    from .scope import Scope
+
+
+class Scheduled:
+    """一次定时发布的句柄，调用即取消，可直接作为 `EffectManager` 的清理函数"""
+
+    __slots__ = ("wheel", "event", "scope", "expires", "interval", "bucket", "cancelled", "__weakref__")
+
+    def __init__(self, wheel: TimerWheel, event: Any, scope: str | Scope | None, expires: int, interval: int):
+        self.wheel = wheel
+        self.event = event
+        self.scope = scope
+        self.expires = expires
+        """到期的刻度"""
+        self.interval = interval
+        """重复发布的间隔刻度数，为 0 时只发布一次"""
+        self.bucket: set[Scheduled] | None = None
+        self.cancelled = False
+
+    @property
+    def when(self) -> float:
+        """下一次发布的时间戳"""
+        return time.time() + (self.expires - self.wheel.ticks()) * self.wheel.tick
+
+    def cancel(self):
+        self.cancelled = True
+        self.interval = 0
+        if self.bucket is not None:
+            self.bucket.discard(self)
+            self.bucket = None
+            self.wheel.size -= 1
+
+    __call__ = cancel
+
+    def __repr__(self):
+        return f"<Scheduled {self.event!r} at tick {self.expires}{f' every {self.interval}' if self.interval else ''}>"
+
+
+class TimerWheel:
+    """分层时间轮
+
+    共 `levels` 层，每层 `2 ** bits` 个槽位，第 0 层每个槽位对应一个长为 `tick` 秒的刻度，
+    上一层的槽位在下一层转满一圈时展开到下一层。所有定时事件由同一个驱动任务推进，
+    每个定时事件只占用一个句柄与一个槽位中的引用，到期事件经由 `publish` 发布。
+
+    刻度由 `clock` 给出的单调时间换算而来，可替换为自定义时钟并配合 `poll` 手动推进。
+    """
+
+    def __init__(self, tick: float = 0.01, bits: int = 8, levels: int = 4, clock: Callable[[], float] = time.monotonic):
+        self.tick = tick
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = levels
+        self.wheels: list[list[set[Scheduled]]] = [[set() for _ in range(1 << bits)] for _ in range(levels)]
+        self.current = 0
+        """已推进到的刻度"""
+        self.size = 0
+        """等待发布的定时事件数"""
+        self.clock = clock
+        self._origin = clock()
+        self._driver: asyncio.Task[None] | None = None
+
+    def ticks(self) -> int:
+        return int((self.clock() - self._origin) / self.tick)
+
+    def schedule(self, delay: float, event: Any, scope: str | Scope | None = None, interval: float | None = None) -> Scheduled:
+        """在 `delay` 秒后发布事件，给出 `interval` 时此后每隔 `interval` 秒重复发布"""
+        if not self.size:
+            # 空闲期间不推进刻度，恢复时直接跳到当前刻度
+            self.current = max(self.current, self.ticks())
+        steps = math.ceil(interval / self.tick) if interval else 0
+        entry = Scheduled(self, event, scope, self.ticks() + max(1, math.ceil(delay / self.tick)), max(steps, 1) if interval else 0)
+        self._place(entry)
+        self.size += 1
+        if self._driver is None or self._driver.done():
+            self._driver = add_task(self._drive())
+        return entry
+
+    def _place(self, entry: Scheduled):
+        delta = max(entry.expires - self.current, 0)
+        for level in range(self.levels):
+            shift = self.bits * level
+            if delta < 1 << (shift + self.bits):
+                index = (max(entry.expires, self.current) >> shift) & self.mask
+                break
+        else:
+            # 超出时间轮范围，暂存于最高层最远的槽位，展开时重新放置
+            index = ((self.current >> shift) - 1) & self.mask
+        entry.bucket = self.wheels[level][index]
+        entry.bucket.add(entry)
+
+    def _advance(self):
+        self.current += 1
+        tick = self.current
+        level = 1
+        while level < self.levels and not (tick >> (self.bits * (level - 1))) & self.mask:
+            level += 1
+        for upper in range(level - 1, 0, -1):
+            bucket = self.wheels[upper][(tick >> (self.bits * upper)) & self.mask]
+            if bucket:
+                entries = list(bucket)
+                bucket.clear()
+                for entry in entries:
+                    self._place(entry)
+        bucket = self.wheels[0][tick & self.mask]
+        if not bucket:
+            return
+        due = list(bucket)
+        bucket.clear()
+        self.size -= len(due)
+        # 先重新放置周期事件，再逐个发布；单个事件发布失败不影响其他到期事件与驱动任务
+        for entry in due:
+            entry.bucket = None
+            if entry.interval:
+                entry.expires = max(entry.expires + entry.interval, tick + 1)
+                self._place(entry)
+                self.size += 1
+        for entry in due:
+            try:
+                publish(entry.event, entry.scope)
+            except Exception as e:
+                if ExceptionHandler.print_traceback:
+                    traceback.print_exception(e)
+
+    def poll(self):
+        """推进到时钟的当前刻度，发布期间到期的定时事件"""
+        now = self.ticks()
+        while self.current < now and self.size:
+            self._advance()
+
+    async def _drive(self):
+        while self.size:
+            delay = self._origin + (self.current + 1) * self.tick - self.clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.poll()
+
+    def clear(self):
+        """取消所有等待中的定时事件"""
+        for wheel in self.wheels:
+            for bucket in wheel:
+                for entry in list(bucket):
+                    entry.cancel()
+
+
+timer_wheel = TimerWheel()
+
+
+def publish_after(delay: float, event: Any, scope: str | Scope | None = None) -> Scheduled:
+    """在 `delay` 秒后发布事件"""
+    return timer_wheel.schedule(delay, event, scope)
+
+
+def publish_at(when: float | datetime, event: Any, scope: str | Scope | None = None) -> Scheduled:
+    """在给定的时间戳或时间点发布事件"""
+    if isinstance(when, datetime):
+        when = when.timestamp()
+    return timer_wheel.schedule(when - time.time(), event, scope)
+
+
+def publish_every(interval: float, event: Any, scope: str | Scope | None = None, *, delay: float | None = None) -> Scheduled:
+    """每隔 `interval` 秒发布一次事件，首次发布在 `delay` 秒后，默认为 `interval`"""
+    return timer_wheel.schedule(interval if delay is None else delay, event, scope, interval)
@@ -1,20 +1,27 @@
 from __future__ import annotations
 
 import warnings
-from collections.abc import Awaitable, Callable
+from bisect import bisect_left, insort
+from collections.abc import Awaitable, Callable, Iterable
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from fnmatch import filter as fnfilter
+from heapq import merge
+from itertools import count
+from operator import attrgetter
 from secrets import token_urlsafe
 from typing import Any, Generic, TypeVar
 
 from tarina import ContextModel
 
+from .admission import AdmissionController
+from .batch import Batcher
 from .decorate import Check, bypass_if, enter_if
 from .effect import EffectManager
 from .provider import TProviders, global_providers
 from .publisher import Publisher, _publishers, filter_publisher
 from .subscriber import Propagator, Subscriber
+from .utils import ExecutorMode, Limiter, _EventSystem, bump_version
 
 T = TypeVar("T")
 TC = TypeVar("TC")
@@ -24,6 +31,16 @@ _scopes: dict[str, Scope] = {}
 
 scope_ctx: ContextModel[Scope] = ContextModel("scope_ctx")
 global_propagators: list[Propagator] = []
+_slot_order = count()
+_listeners: dict[str, int] = {}
+"""已注册且可用的作用域中，各发布者对应的订阅者槽位数"""
+
+
+def _count(pub_id: str, delta: int):
+    if n := _listeners.get(pub_id, 0) + delta:
+        _listeners[pub_id] = n
+    else:
+        _listeners.pop(pub_id, None)
 
 
 @dataclass(slots=True, frozen=True)
@@ -31,6 +48,11 @@ class SubscriberSlot:
     subscriber: Subscriber
     publisher_id: str
     priority: int
+    order: int = field(default=0, compare=False)
+    """注册顺序，用于同优先级槽位间的排序"""
+
+
+_slot_key = attrgetter("priority", "order")
 
 
 @dataclass
@@ -44,6 +66,11 @@ class RegisterWrapper(Generic[T, TC]):
     _once: bool
     _skip_req_missing: bool
     _label: str | None
+    _codegen: bool = False
+    _executor: ExecutorMode = "thread"
+    _batch_size: int | None = None
+    _max_delay: float = 0.05
+    _lazy: bool = False
     _depth: int = 2
 
     def if_(self, predicate: Check | Callable[..., bool] | Callable[..., Awaitable[bool]] | bool, priority: int = 0):
@@ -62,23 +89,30 @@ class RegisterWrapper(Generic[T, TC]):
         if isinstance(func, Subscriber):
             func = func.callable_target
         events = self._publisher[0] if self._publisher else None
-        res = Subscriber(func, priority=self._priority, providers=self._providers, dispose=self._scope.remove_subscriber, once=self._once, skip_req_missing=self._skip_req_missing, _listen=events, label=self._label)
+        batcher = None
+        if self._batch_size:
+            batcher = Batcher(func, self._batch_size, self._max_delay, self._executor)
+            func = batcher.collector()
+        res = Subscriber(func, priority=self._priority, providers=self._providers, dispose=self._scope.remove_subscriber, once=self._once, skip_req_missing=self._skip_req_missing, _listen=events, label=self._label, codegen=self._codegen, executor=self._executor, lazy=self._lazy)
         if res.label == "_" or res.label == "<lambda>":  # pragma: no cover
             warnings.warn(
                 f"{res!r} has no label, consider using a named function instead of '_'",
                 UserWarning,
                 self._depth,
             )
+        res.scope = self._scope
+        if batcher:
+            res._attach_disposes(batcher.close)
         for pro in self._propagators:
             res.propagate(pro, _skip_providers=True)
         pubs = self._publisher[1] if self._publisher else None
         pubs = (pubs,) if isinstance(pubs, Publisher) else pubs
         if not pubs:
-            self._scope.subscribers.append(SubscriberSlot(res, "$backend", res.priority))
+            self._scope.add_slot(SubscriberSlot(res, "$backend", res.priority, next(_slot_order)))
         else:
             for pub in pubs:
                 if pub.check_subscriber(res):
-                    self._scope.subscribers.append(SubscriberSlot(res, pub.id, res.priority))
+                    self._scope.add_slot(SubscriberSlot(res, pub.id, res.priority, next(_slot_order)))
         self._effect_manager.effect(lambda: res.dispose, res.id)
         return res
 
@@ -88,24 +122,35 @@ TWrapper = TypeVar("TWrapper", bound=RegisterWrapper[None, Callable])
 
 class Scope(Generic[TWrapper]):
     global_skip_req_missing = False
+    global_codegen = False
+    global_lazy = False
+    global_executor: ExecutorMode = "thread"
 
     @staticmethod
     def root():
         return _scopes["$global"]
 
     @classmethod
-    def of(cls, id_: str | None = None, effect_manager: EffectManager | None = None):
-        sp = cls(id_, effect_manager)
+    def of(cls, id_: str | None = None, effect_manager: EffectManager | None = None, executor: ExecutorMode | None = None, max_in_flight: int | None = None):
+        sp = cls(id_, effect_manager, executor, max_in_flight)
+        if (old := _scopes.get(sp.id)) and old.live:
+            old._track(-1)
         _scopes[sp.id] = sp
+        bump_version()
         return sp
 
     @classmethod
     def wrapper_class(cls):
         return RegisterWrapper
 
-    def __init__(self, id_: str | None = None, effect_manager: EffectManager | None = None):
+    def __init__(self, id_: str | None = None, effect_manager: EffectManager | None = None, executor: ExecutorMode | None = None, max_in_flight: int | None = None):
         self.id = id_ or token_urlsafe(16)
-        self.subscribers: list[SubscriberSlot] = []
+        self.executor = executor
+        self.limiter = Limiter(max_in_flight)
+        self._slots: dict[str, list[SubscriberSlot]] = {}
+        self._index: dict[str, dict[int, SubscriberSlot]] = {"$backend": {}}
+        self._sorted: dict[str, list[SubscriberSlot]] = {"$backend": []}
+        """各发布者对应的订阅者槽位，始终按优先级与注册顺序排序"""
         self._effect_manager = effect_manager or EffectManager()
         self.effect = self._effect_manager.effect
         self.available = True
@@ -123,15 +168,79 @@ class Scope(Generic[TWrapper]):
         finally:
             scope_ctx.reset(token)
 
+    @property
+    def live(self) -> bool:
+        """该作用域是否已注册且可用，即其订阅者是否计入全局的订阅者计数"""
+        return self.available and _scopes.get(self.id) is self
+
+    def _track(self, sign: int):
+        for pub_id, bucket in self._index.items():
+            if bucket:
+                _count(pub_id, sign * len(bucket))
+
+    @property
+    def subscribers(self) -> tuple[SubscriberSlot, ...]:
+        """该作用域下的所有订阅者槽位，按注册顺序排列
+
+        返回的是只读的快照，增删槽位请使用 `add_slot` 与 `remove_subscriber`。
+        """
+        return tuple(slot for slots in self._slots.values() for slot in slots)
+
+    def add_slot(self, slot: SubscriberSlot) -> None:
+        """添加订阅者槽位，并放入对应发布者的索引中"""
+        self._slots.setdefault(slot.subscriber.id, []).append(slot)
+        self._index.setdefault(slot.publisher_id, {})[id(slot)] = slot
+        insort(self._sorted.setdefault(slot.publisher_id, []), slot, key=_slot_key)
+        if self.live:
+            _count(slot.publisher_id, 1)
+        bump_version()
+
+    def buckets(self, pub_ids: Iterable[str], pass_backend: bool = True) -> list[list[SubscriberSlot]]:
+        """获取给定发布者对应的订阅者槽位列表，每个列表均已按优先级与注册顺序排序"""
+        ordered = self._sorted
+        res = [ordered[pub_id] for pub_id in pub_ids if pub_id in ordered]
+        if pass_backend and ordered["$backend"]:
+            res.append(ordered["$backend"])
+        return res
+
+    def ordered(self, pub_ids: Iterable[str], pass_backend: bool = True) -> Iterable[SubscriberSlot]:
+        """按优先级与注册顺序遍历给定发布者对应的订阅者槽位"""
+        buckets = self.buckets(pub_ids, pass_backend)
+        if len(buckets) == 1:
+            return buckets[0]
+        return merge(*buckets, key=_slot_key)
+
     def remove_subscriber(self, subscriber: Subscriber) -> None:
         """移除订阅者"""
-        indexes = [i for i, slot in enumerate(self.subscribers) if slot.subscriber.id == subscriber.id]
-        for i in reversed(indexes):
-            self.subscribers.pop(i)
-
-    def register(self, func: Callable[..., Any] | None = None, event: type | None = None, *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, publisher: str | Publisher | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None):
-        """注册一个订阅者"""
+        if not (slots := self._slots.pop(subscriber.id, None)):
+            return
+        live = self.live
+        for slot in slots:
+            if live:
+                _count(slot.publisher_id, -1)
+            bucket = self._index[slot.publisher_id]
+            del bucket[id(slot)]
+            if not bucket and slot.publisher_id != "$backend":
+                del self._index[slot.publisher_id]
+                del self._sorted[slot.publisher_id]
+                continue
+            # 按排序键二分定位后原地删除，避免下次分发时重新排序整个列表
+            ordered = self._sorted[slot.publisher_id]
+            i = bisect_left(ordered, _slot_key(slot), key=_slot_key)
+            while ordered[i] is not slot:
+                i += 1
+            del ordered[i]
+        bump_version()
+
+    def register(self, func: Callable[..., Any] | None = None, event: type | None = None, *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, publisher: str | Publisher | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None):
+        """注册一个订阅者
+
+        指定 `batch_size` 时注册为批量订阅者，事件被缓冲后一次性交给处理函数，各参数得到列表
+        """
         _skip_req_missing = self.global_skip_req_missing if skip_req_missing is None else skip_req_missing
+        _codegen = self.global_codegen if codegen is None else codegen
+        _lazy = self.global_lazy if lazy is None else lazy
+        _executor = executor or self.executor or self.global_executor
         providers = providers or []
         propagators = propagators or []
         if isinstance(publisher, Publisher):
@@ -159,26 +268,36 @@ class Scope(Generic[TWrapper]):
 
         _propagators: list[Propagator] = [*global_propagators, *self.propagators, *propagators]
         _propagator_providers = [p for pro in _propagators for p in pro.providers()]
-        register_wrapper = self.wrapper_class()(self, slots, priority, [*global_providers, *event_providers, *self.providers, *providers, *_propagator_providers], _propagators, self._effect_manager, once, _skip_req_missing, label)
+        register_wrapper = self.wrapper_class()(self, slots, priority, [*global_providers, *event_providers, *self.providers, *providers, *_propagator_providers], _propagators, self._effect_manager, once, _skip_req_missing, label, _codegen, _executor, batch_size, max_delay, _lazy)
         if func:
             register_wrapper._depth += 2
             return register_wrapper(func)
         return register_wrapper
 
+    def warmup(self) -> int:
+        """立即编译该作用域下所有延迟编译的订阅者，返回本次编译的订阅者数量"""
+        compiled = 0
+        for slots in self._slots.values():
+            if slots[0].subscriber.compile():
+                compiled += 1
+        return compiled
+
     def iter(self, pub_ids: set[str], pass_backend: bool = True):
-        for slot in self.subscribers:
-            if slot.publisher_id in pub_ids or (pass_backend and slot.publisher_id == "$backend"):
-                yield slot.subscriber
+        for slot in self.ordered(pub_ids, pass_backend):
+            yield slot.subscriber
 
     def disable(self):
+        if self.live:
+            self._track(-1)
         self.available = False
-        for slot in self.subscribers:
-            slot.subscriber.available = False
+        bump_version()
 
     def enable(self):
-        self.available = True
-        for slot in self.subscribers:
-            slot.subscriber.available = True
+        if not self.available:
+            self.available = True
+            if self.live:
+                self._track(1)
+        bump_version()
 
     def dispose(self):
         self.disable()
@@ -189,29 +308,57 @@ class Scope(Generic[TWrapper]):
 _scopes["$global"] = Scope("$global")
 
 
-def configure(skip_req_missing: bool = False):
-    Scope.global_skip_req_missing = skip_req_missing
-
-
-def on(event: type, func: Callable[..., Any] | None = None, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None):
+_KEEP: Any = object()
+
+
+def configure(
+    skip_req_missing: bool | None = _KEEP,
+    codegen: bool | None = _KEEP,
+    executor: ExecutorMode | None = _KEEP,
+    max_in_flight: int | None = _KEEP,
+    admission: AdmissionController | None = _KEEP,
+    lazy: bool | None = _KEEP,
+):
+    """修改全局配置，未给出的选项保持不变
+
+    显式传入 None 时恢复对应选项的默认值，`max_in_flight` 与 `admission` 即取消对应的限制；
+    注意不带参数调用 `configure()` 不再将 `skip_req_missing` 重置为 False，需显式传入 False 或 None
+    """
+    if skip_req_missing is not _KEEP:
+        Scope.global_skip_req_missing = bool(skip_req_missing)
+    if codegen is not _KEEP:
+        Scope.global_codegen = bool(codegen)
+    if lazy is not _KEEP:
+        Scope.global_lazy = bool(lazy)
+    if executor is not _KEEP:
+        Scope.global_executor = executor or "thread"
+    if max_in_flight is not _KEEP:
+        _EventSystem.limiter.limit = max_in_flight
+    if admission is not _KEEP:
+        if _EventSystem.admission and _EventSystem.admission is not admission:
+            _EventSystem.admission.close()
+        _EventSystem.admission = admission
+
+
+def on(event: type, func: Callable[..., Any] | None = None, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None):
     if not (scope := scope_ctx.get()):
         scope = _scopes["$global"]
     if not func:
-        return scope.register(event=event, priority=priority, providers=providers, propagators=propagators, skip_req_missing=skip_req_missing, once=once, label=label)
-    return scope.register(func, event=event, priority=priority, providers=providers, propagators=propagators, skip_req_missing=skip_req_missing, once=once, label=label)
+        return scope.register(event=event, priority=priority, providers=providers, propagators=propagators, skip_req_missing=skip_req_missing, once=once, label=label, codegen=codegen, executor=executor, batch_size=batch_size, max_delay=max_delay, lazy=lazy)
+    return scope.register(func, event=event, priority=priority, providers=providers, propagators=propagators, skip_req_missing=skip_req_missing, once=once, label=label, codegen=codegen, executor=executor, batch_size=batch_size, max_delay=max_delay, lazy=lazy)
 
 
-def on_global(func: Callable[..., Any] | None = None, priority: int = 16, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None):
+def on_global(func: Callable[..., Any] | None = None, priority: int = 16, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None):
     if not (scope := scope_ctx.get()):
         scope = _scopes["$global"]
     if not func:
-        return scope.register(event=None, priority=priority, skip_req_missing=skip_req_missing, once=once, label=label)
-    return scope.register(func, event=None, priority=priority, skip_req_missing=skip_req_missing, once=once, label=label)
+        return scope.register(event=None, priority=priority, skip_req_missing=skip_req_missing, once=once, label=label, codegen=codegen, executor=executor, batch_size=batch_size, max_delay=max_delay, lazy=lazy)
+    return scope.register(func, event=None, priority=priority, skip_req_missing=skip_req_missing, once=once, label=label, codegen=codegen, executor=executor, batch_size=batch_size, max_delay=max_delay, lazy=lazy)
 
 
-def use(pub: str | Publisher, func: Callable[..., Any] | None = None, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None):
+def use(pub: str | Publisher, func: Callable[..., Any] | None = None, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None):
     if not (scope := scope_ctx.get()):
         scope = _scopes["$global"]
     if not func:
-        return scope.register(priority=priority, providers=providers, propagators=propagators, once=once, skip_req_missing=skip_req_missing, publisher=pub, label=label)
-    return scope.register(func, priority=priority, providers=providers, propagators=propagators, once=once, skip_req_missing=skip_req_missing, publisher=pub, label=label)
+        return scope.register(priority=priority, providers=providers, propagators=propagators, once=once, skip_req_missing=skip_req_missing, publisher=pub, label=label, codegen=codegen, executor=executor, batch_size=batch_size, max_delay=max_delay, lazy=lazy)
+    return scope.register(func, priority=priority, providers=providers, propagators=propagators, once=once, skip_req_missing=skip_req_missing, publisher=pub, label=label, codegen=codegen, executor=executor, batch_size=batch_size, max_delay=max_delay, lazy=lazy)
@@ -1,19 +1,20 @@
 import asyncio
-from collections.abc import AsyncGenerator, Awaitable, Callable, Generator
+from collections.abc import AsyncGenerator, Awaitable, Callable, Generator, Iterable
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, ClassVar, Generic, TypeVar, overload
 from typing_extensions import Self
 
 from tarina import ContextModel
 
+from .admission import AdmissionController
 from .decorate import Check
 from .effect import EffectManager
 from .exceptions import ExitState
 from .provider import Provider, ProviderFactory, TProviders
 from .publisher import Publisher
 from .subscriber import Propagator, Subscriber
-from .utils import Resultable
+from .utils import ExecutorMode, Limiter, Resultable
 
 T = TypeVar("T")
 TC = TypeVar("TC")
@@ -28,6 +29,7 @@ class SubscriberSlot:
     subscriber: Subscriber
     publisher_id: str
     priority: int
+    order: int = field(default=0, compare=False)
 
 
 class RegisterWrapper(Generic[T, TC]):
@@ -39,13 +41,18 @@ class RegisterWrapper(Generic[T, TC]):
     _once: bool
     _skip_req_missing: bool
     _label: str | None
+    _codegen: bool
+    _executor: ExecutorMode
+    _batch_size: int | None
+    _max_delay: float
+    _lazy: bool
     _effect_manager: EffectManager
     _depth: int
 
     def if_(self, predicate: Check | Callable[..., bool] | Callable[..., Awaitable[bool]] | bool, priority: int = 0) -> Self: ...
     def unless(self, predicate: Check | Callable[..., bool] | Callable[..., Awaitable[bool]] | bool, priority: int = 0) -> Self: ...
     def propagate(self, *propagators: Propagator) -> Self: ...
-    def __init__(self, _scope: Scope, _publisher: tuple[type, Publisher] | tuple[tuple[type, ...], tuple[Publisher, ...]] | None, _priority: int, _providers: TProviders, _propagators: list[Propagator], _effect_manager: EffectManager, _once: bool = False, _skip_req_missing: bool | None = None, _label: str | None = None, _depth: int = 2): ...
+    def __init__(self, _scope: Scope, _publisher: tuple[type, Publisher] | tuple[tuple[type, ...], tuple[Publisher, ...]] | None, _priority: int, _providers: TProviders, _propagators: list[Propagator], _effect_manager: EffectManager, _once: bool = False, _skip_req_missing: bool | None = None, _label: str | None = None, _codegen: bool = False, _executor: ExecutorMode = "thread", _batch_size: int | None = None, _max_delay: float = 0.05, _lazy: bool = False, _depth: int = 2): ...
     @overload
     def __call__(self: RegisterWrapper[None, Callable], func: Callable[..., T1]) -> Subscriber[T1]: ...
     @overload
@@ -63,9 +70,13 @@ TWrapper = TypeVar("TWrapper", bound=RegisterWrapper[None, Callable])
 
 class Scope(Generic[TWrapper]):
     global_skip_req_missing: ClassVar[bool]
+    global_codegen: ClassVar[bool]
+    global_lazy: ClassVar[bool]
+    global_executor: ClassVar[ExecutorMode]
     id: str
-    subscribers: list[SubscriberSlot]
     available: bool
+    executor: ExecutorMode | None
+    limiter: Limiter
     providers: list[Provider[Any] | ProviderFactory]
     propagators: list[Propagator]
     _effect_manager: EffectManager
@@ -77,56 +88,71 @@ class Scope(Generic[TWrapper]):
     @classmethod
     def wrapper_class(cls) -> type[TWrapper]: ...
     @classmethod
-    def of(cls: type[Self], id_: str | None = None, effect_manager: EffectManager | None = None) -> Self: ...
-    def __init__(self, id_: str | None = None, effect_manager: EffectManager | None = None): ...
+    def of(cls: type[Self], id_: str | None = None, effect_manager: EffectManager | None = None, executor: ExecutorMode | None = None, max_in_flight: int | None = None) -> Self: ...
+    def __init__(self, id_: str | None = None, effect_manager: EffectManager | None = None, executor: ExecutorMode | None = None, max_in_flight: int | None = None): ...
     @contextmanager
     def context(self) -> Generator[Scope, None, None]: ...
+    @property
+    def live(self) -> bool: ...
+    @property
+    def subscribers(self) -> tuple[SubscriberSlot, ...]: ...
+    def add_slot(self, slot: SubscriberSlot) -> None: ...
+    def buckets(self, pub_ids: Iterable[str], pass_backend: bool = True) -> list[list[SubscriberSlot]]: ...
+    def ordered(self, pub_ids: Iterable[str], pass_backend: bool = True) -> Iterable[SubscriberSlot]: ...
     def remove_subscriber(self, subscriber: Subscriber) -> None: ...
     @overload
-    def register(self, func: Callable[..., T], event: type | None = None, *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, publisher: str | Publisher | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[T]: ...
+    def register(self, func: Callable[..., T], event: type | None = None, *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, publisher: str | Publisher | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[T]: ...
     @overload
-    def register(self, *, event: type | None = None, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, publisher: str | Publisher | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> TWrapper: ...
+    def register(self, *, event: type | None = None, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, publisher: str | Publisher | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> TWrapper: ...
     def iter(self, pub_ids: set[str], pass_backend: bool = True) -> Generator[Subscriber, None, None]: ...
+    def warmup(self) -> int: ...
     def disable(self) -> None: ...
     def enable(self) -> None: ...
     def dispose(self) -> set[asyncio.Task]: ...
 
 
-def configure(skip_req_missing: bool = False) -> None: ...
+def configure(
+    skip_req_missing: bool | None = ...,
+    codegen: bool | None = ...,
+    executor: ExecutorMode | None = ...,
+    max_in_flight: int | None = ...,
+    admission: AdmissionController | None = ...,
+    lazy: bool | None = ...,
+) -> None: ...
 
 @overload
-def on(event: type[Resultable[T1]], func: Callable[..., Generator[T1 | ExitState | None, None, None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[Generator[T1, None, None]]: ...
+def on(event: type[Resultable[T1]], func: Callable[..., Generator[T1 | ExitState | None, None, None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[Generator[T1, None, None]]: ...
 @overload
-def on(event: type[Resultable[T1]], func: Callable[..., AsyncGenerator[T1 | ExitState | None, None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[AsyncGenerator[T1, None]]: ...
+def on(event: type[Resultable[T1]], func: Callable[..., AsyncGenerator[T1 | ExitState | None, None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[AsyncGenerator[T1, None]]: ...
 @overload
-def on(event: type[Resultable[T1]], func: Callable[..., Awaitable[T1 | ExitState | None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[Awaitable[T1]]: ...
+def on(event: type[Resultable[T1]], func: Callable[..., Awaitable[T1 | ExitState | None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[Awaitable[T1]]: ...
 @overload
-def on(event: type[Resultable[T1]], func: Callable[..., T1 | ExitState | None], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[T1]: ...
+def on(event: type[Resultable[T1]], func: Callable[..., T1 | ExitState | None], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[T1]: ...
 @overload
-def on(event: type[Resultable[T1]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> RegisterWrapper[T1, None]: ...
+def on(event: type[Resultable[T1]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> RegisterWrapper[T1, None]: ...
 @overload
-def on(event: type[Any], func: Callable[..., T], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[T]: ...  # type: ignore
+def on(event: type[Any], func: Callable[..., T], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[T]: ...  # type: ignore
 @overload
-def on(event: type[Any], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> RegisterWrapper[None, Callable]: ...  # type: ignore
+def on(event: type[Any], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> RegisterWrapper[None, Callable]: ...  # type: ignore
 @overload
-def on_global(func: Callable[..., T], *, priority: int = 16, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[T]: ...
+def on_global(func: Callable[..., T], *, priority: int = 16, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[T]: ...
 @overload
-def on_global(*, priority: int = 16, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> RegisterWrapper[None, Callable]: ...
+def on_global(*, priority: int = 16, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> RegisterWrapper[None, Callable]: ...
 @overload
-def use(pub: Publisher[Resultable[T1]], func: Callable[..., Generator[T1 | ExitState | None, None, None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[Generator[T1, None, None]]: ...
+def use(pub: Publisher[Resultable[T1]], func: Callable[..., Generator[T1 | ExitState | None, None, None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[Generator[T1, None, None]]: ...
 @overload
-def use(pub: Publisher[Resultable[T1]], func: Callable[..., AsyncGenerator[T1 | ExitState | None, None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[AsyncGenerator[T1, None]]: ...
+def use(pub: Publisher[Resultable[T1]], func: Callable[..., AsyncGenerator[T1 | ExitState | None, None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[AsyncGenerator[T1, None]]: ...
 @overload
-def use(pub: Publisher[Resultable[T1]], func: Callable[..., Awaitable[T1 | ExitState | None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[Awaitable[T1]]: ...
+def use(pub: Publisher[Resultable[T1]], func: Callable[..., Awaitable[T1 | ExitState | None]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[Awaitable[T1]]: ...
 @overload
-def use(pub: Publisher[Resultable[T1]], func: Callable[..., T1 | ExitState | None], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[T1]: ...
+def use(pub: Publisher[Resultable[T1]], func: Callable[..., T1 | ExitState | None], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[T1]: ...
 @overload
-def use(pub: Publisher[Resultable[T1]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> RegisterWrapper[T1, None]: ...
+def use(pub: Publisher[Resultable[T1]], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> RegisterWrapper[T1, None]: ...
 @overload
-def use(pub: Publisher[Any], func: Callable[..., T], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[T]: ...
+def use(pub: Publisher[Any], func: Callable[..., T], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[T]: ...
 @overload
-def use(pub: Publisher[Any], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> RegisterWrapper[None, Callable]: ...
+def use(pub: Publisher[Any], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> RegisterWrapper[None, Callable]: ...
 @overload
-def use(pub: str, func: Callable[..., T], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> Subscriber[T]: ...
+def use(pub: str, func: Callable[..., T], *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> Subscriber[T]: ...
 @overload
-def use(pub: str, *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None) -> RegisterWrapper[None, Callable]: ...
+def use(pub: str, *, priority: int = 16, providers: TProviders | None = None, propagators: list[Propagator] | None = None, once: bool = False, skip_req_missing: bool | None = None, label: str | None = None, codegen: bool | None = None, executor: ExecutorMode | None = None, batch_size: int | None = None, max_delay: float = 0.05, lazy: bool | None = None) -> RegisterWrapper[None, Callable]: ...
@@ -2,23 +2,27 @@ from __future__ import annotations
 
 import abc
 import asyncio
+import pickle
 import sys
 from collections import defaultdict
 from collections.abc import AsyncGenerator, Awaitable, Callable, Generator, Sequence
+from concurrent.futures import Executor
 from contextlib import AsyncExitStack, asynccontextmanager
 from contextvars import ContextVar
 from dataclasses import dataclass
-from types import CoroutineType
-from typing import Annotated, Any, Generic, TypeVar, final, get_args, get_origin, overload
+from functools import partial
+from types import CoroutineType, FunctionType
+from typing import TYPE_CHECKING, Annotated, Any, Generic, TypeVar, final, get_args, get_origin, overload
 from typing_extensions import Self
 from uuid import uuid4
 from weakref import WeakSet, finalize
 
-from tarina import Empty, is_async, signatures
+from tarina import Empty, generic_issubclass, is_async, signatures
+from tarina.generic import is_optional
 from tarina.guard import is_async_gen_callable, is_gen_callable
 from tarina.tools import run_sync, run_sync_generator
 
-from .context import Contexts, CtxItem
+from .context import DEPEND_CACHE, EVENT, Contexts, CtxItem, LayeredContexts
 from .effect import Disposable
 from .exceptions import (
     STOP,
@@ -29,8 +33,12 @@ from .exceptions import (
     UnresolvedRequirement,
     _ExitException,
 )
-from .provider import Param, Provider, ProviderFactory, TProviders, provide
-from .utils import Force, Result, TTarget
+from .executor import is_process_executor, run_in_executor, run_in_executor_generator, run_in_process
+from .provider import Param, Provider, ProviderFactory, ProviderRegistry, TProviders, get_registry, provide
+from .utils import ExecutorMode, Force, Result, TTarget, _EventSystem, run_inline, run_inline_generator
+
+if TYPE_CHECKING:
+    from .scope import Scope
 
 R = TypeVar("R")
 T = TypeVar("T")
@@ -41,7 +49,43 @@ SUBSCRIBER: CtxItem[Subscriber] = CtxItem.make("$subscriber")
 current_subscriber: ContextVar[Subscriber] = ContextVar("_current_subscriber")
 
 
+class _ExitStack(AsyncExitStack):
+    """记录是否压入过回调的 `AsyncExitStack`，未使用过的栈在分发结束时无需展开"""
+
+    used = False
+
+    def push(self, exit):
+        self.used = True
+        return super().push(exit)
+
+    def enter_context(self, cm):
+        self.used = True
+        return super().enter_context(cm)
+
+    def callback(self, callback, /, *args, **kwds):
+        self.used = True
+        return super().callback(callback, *args, **kwds)
+
+    async def enter_async_context(self, cm):
+        self.used = True
+        return await super().enter_async_context(cm)
+
+    def push_async_exit(self, exit):
+        self.used = True
+        return super().push_async_exit(exit)
+
+    def push_async_callback(self, callback, /, *args, **kwds):
+        self.used = True
+        return super().push_async_callback(callback, *args, **kwds)
+
+
+_RECORD_LIMIT = 64
+
+
 class ResultProvider(Provider[Any]):
+    names = frozenset(("result",))
+    cacheable = True
+
     def validate(self, param: Param):
         return param.name == "result"
 
@@ -59,24 +103,24 @@ class Depend:
         self.target = callable_func
         self.cache = cache
 
-    def fork(self, provider: list[Provider | ProviderFactory]):
+    def fork(self, provider: list[Provider | ProviderFactory], executor: ExecutorMode = "thread"):
         if hasattr(self, "sub"):  # pragma: no cover
             return self
         new = Depend(self.target, self.cache)
-        new.sub = Subscriber(self.target, providers=provider)
+        new.sub = Subscriber(self.target, providers=provider, executor=executor)
         return new
 
     async def __call__(self, context: Contexts):
-        if "$depend_cache" not in context:
-            context["$depend_cache"] = {}
-        cache = context["$depend_cache"]
+        if DEPEND_CACHE not in context:
+            context[DEPEND_CACHE] = {}
+        cache = context[DEPEND_CACHE]
         if self.cache and self.target in cache:
             fut = cache[self.target]
             await fut
             return fut.result()
         cache[self.target] = fut = asyncio.Future()
         try:
-            res = await self.sub.handle(context.copy(), inner=True)
+            res = await self.sub.handle(LayeredContexts(context), inner=True)
         except BaseException as e:  # pragma: no cover
             fut.set_exception(e)
             fut.cancel()
@@ -104,50 +148,57 @@ def depends(cache: bool = False) -> Callable[[TTarget[Any]], Any]:
 @dataclass(slots=True)
 class CompileParam(Param):
     depend: Depend | None
-    record: Provider | None
+    record: dict[type, Provider] | None
+    """按事件类型记录上一次提供了该参数的 Provider"""
+    hits: int = 0
+    """由记录的 Provider 直接提供的次数"""
+    misses: int = 0
+    """需要按优先级依次尝试 Provider 的次数"""
 
     async def solve(self, context: Contexts | dict[str, Any]):
         if self.name in context:
             return context[self.name]
-        if self.record and (res := await self.record(context)) is not None:  # type: ignore
+        event_type = context.get(EVENT).__class__
+        if self.record and (provider := self.record.get(event_type)) and (res := await provider(context)) is not None:  # type: ignore
+            self.hits += 1
             if res.__class__ is Force:
                 res = res.value
             return res
+        self.misses += 1
         for _provider in self.providers:
             res = await _provider(context)  # type: ignore
             if res is None:
                 continue
             if res.__class__ is Force:
                 res = res.value
-            self.record = _provider
+            if self.record is None or len(self.record) >= _RECORD_LIMIT:
+                self.record = {}
+            self.record[event_type] = _provider
             return res
         if self.default is not Empty:
             return self.default
         raise UnresolvedRequirement(self.name, self.annotation, self.default, self.providers)
 
 
-def _compile_single(param: CompileParam, providers: list[Provider | ProviderFactory]) -> CompileParam:
+def _compile_single(param: CompileParam, providers: list[Provider | ProviderFactory] | ProviderRegistry, executor: ExecutorMode = "thread") -> CompileParam:
     from .ref import Deref, generate
 
     name = param.name
     anno = param.annotation
-    for _provider in providers:
-        if isinstance(_provider, ProviderFactory):
-            if result := _provider.validate(param):
-                param.providers.append(result)
-        elif _provider.validate(param):
-            param.providers.append(_provider)
+    registry = providers if isinstance(providers, ProviderRegistry) else get_registry(providers)
+    providers = registry.providers
+    registry.resolve(param)
     param.providers.sort(key=lambda x: x.priority)
     if get_origin(anno) is Annotated:
         org, *meta = get_args(anno)
         for m in reversed(meta):
             if isinstance(m, Depend):
-                param.depend = m.fork(providers)
+                param.depend = m.fork(providers, executor)
                 break
             if isinstance(m, Provider):
                 param.providers.insert(0, m)
             elif isinstance(m, str):
-                param.providers.insert(0, provide(org, name, lambda x: x.get(m)))
+                param.providers.insert(0, provide(org, name, m))
             elif isinstance(m, Deref):
                 param.providers.insert(0, provide(org, name, generate(m)))
             elif callable(m):
@@ -156,18 +207,169 @@ def _compile_single(param: CompileParam, providers: list[Provider | ProviderFact
         param.providers.insert(0, provide(anno, name, generate(param.default)))
         param.default = Empty
     if isinstance(param.default, Depend):
-        param.depend = param.default.fork(providers)
+        param.depend = param.default.fork(providers, executor)
         param.default = Empty
     return param
 
 
-def _compile(target: Callable, providers: list[Provider | ProviderFactory]) -> list[CompileParam]:
+_CO_VARARGS = 0x04
+_CO_VARKEYWORDS = 0x08
+
+
+def _signatures(target: Callable) -> list[tuple[str, Any, Any]]:
+    """同 `tarina.signatures`，普通函数的参数直接从代码对象、默认值与注解还原，省去 `inspect.signature`
+
+    带有可变参数、`__wrapped__` 或 `__signature__` 的函数及其他可调用对象仍交由 `tarina.signatures`
+    """
+    if (
+        target.__class__ is not FunctionType
+        or target.__code__.co_flags & (_CO_VARARGS | _CO_VARKEYWORDS)
+        or hasattr(target, "__wrapped__")
+        or hasattr(target, "__signature__")
+    ):
+        return signatures(target)
+    code = target.__code__
+    argcount = code.co_argcount
+    annotations = target.__annotations__
+    defaults = target.__defaults__ or ()
+    kwdefaults = target.__kwdefaults__ or {}
+    offset = argcount - len(defaults)
     res = []
-    for name, anno, default in signatures(target):
-        res.append(_compile_single(CompileParam(name, anno, default, [], None, None), providers))
+    for index, name in enumerate(code.co_varnames[: argcount + code.co_kwonlyargcount]):
+        if (anno := annotations.get(name)).__class__ is str:
+            anno = eval(anno, target.__globals__)  # noqa: S307
+        if index < argcount:
+            default = defaults[index - offset] if index >= offset else Empty
+        else:
+            default = kwdefaults.get(name, Empty)
+        res.append((name, anno, default))
     return res
 
 
+def _compile(target: Callable, providers: list[Provider | ProviderFactory], executor: ExecutorMode = "thread") -> list[CompileParam]:
+    registry = get_registry(providers)
+    return [_compile_single(CompileParam(name, anno, default, [], None, None), registry, executor) for name, anno, default in _signatures(target)]
+
+
+def _reject_process(call: Callable[..., Any]):
+    raise TypeError(f"{call!r} is a generator and can't be run in a process pool")
+
+
+def _check_process_params(sub: Subscriber):
+    """注册时检查交由进程池执行的订阅者，参数必须能被序列化后发送至工作进程"""
+    # 上下文、订阅者与 AsyncExitStack 无法发送至工作进程，其子类 (如 `LayeredContexts`) 与 `Optional` 形式同样如此
+    unpicklable = (Contexts, Subscriber, AsyncExitStack)
+    for param in sub.params:
+        anno = param.annotation
+        if get_origin(anno) is Annotated:
+            anno = get_args(anno)[0]
+        if anno is not Any and (generic_issubclass(anno, unpicklable) or is_optional(anno, unpicklable)):
+            raise TypeError(f"parameter {param.name!r} of {sub.label!r} receives {param.annotation!r}, which can't be sent to a process pool")
+        if param.default is not Empty:
+            try:
+                pickle.dumps(param.default)
+            except Exception as e:
+                raise TypeError(f"default of parameter {param.name!r} of {sub.label!r} is not picklable") from e
+
+
+_HANDLE_TEMPLATE = """\
+async def handle(context, inner=False):
+    token = current_subscriber.set(self)
+    if not inner:
+        context[SUBSCRIBER] = self
+        context[STACK] = _ExitStack()
+    try:
+        if self._cursor and (ans := await self._run_propagate(context, self._propagates[: self._cursor])):
+            return ans
+{resolve}
+{call}
+        if self._after_propagates:
+            context[RESULT] = result
+            propagate_result = await self._run_propagate(context, self._propagates[self._cursor :])
+            result = result if propagate_result is None else propagate_result
+    except InnerHandlerException as e:
+        if inner:
+            raise
+        e1 = e.args[0]
+        if isinstance(e1, (UnresolvedRequirement, ProviderUnsatisfied)) and self.skip_req_missing:
+            return STOP
+        raise ExceptionHandler.call(e, self.callable_target, context, inner) from e1
+    except Exception as e:
+        if isinstance(e, _ExitException):
+            return e
+        if isinstance(e, (UnresolvedRequirement, ProviderUnsatisfied)) and self.skip_req_missing:
+            return STOP
+        raise ExceptionHandler.call(e, self.callable_target, context, inner) from e
+    finally:
+        current_subscriber.reset(token)
+        if not inner:
+            if STACK in context and getattr(exit_stack := context[STACK], "used", True):
+                typ, e, tb = sys.exc_info()
+                await exit_stack.__aexit__(typ, e, tb)
+            context.clear()
+        if self.once:
+            self.dispose()
+    return result
+"""
+
+
+def _generate_handle(sub: Subscriber) -> Callable[..., Awaitable[Any]]:
+    """为订阅者生成专用的 `handle` 函数
+
+    参数解析被展开为内联代码：上下文命中检查、依赖与各 Provider 按优先级依次调用，
+    不再逐个经过 `CompileParam.solve`；目标函数以关键字参数直接调用。
+    """
+    namespace: dict[str, Any] = {
+        "self": sub,
+        "sys": sys,
+        "_ExitStack": _ExitStack,
+        "current_subscriber": current_subscriber,
+        "SUBSCRIBER": SUBSCRIBER,
+        "STACK": STACK,
+        "RESULT": RESULT,
+        "STOP": STOP,
+        "Force": Force,
+        "ExceptionHandler": ExceptionHandler,
+        "InnerHandlerException": InnerHandlerException,
+        "ProviderUnsatisfied": ProviderUnsatisfied,
+        "UnresolvedRequirement": UnresolvedRequirement,
+        "_ExitException": _ExitException,
+        "_target": sub._callable_target,
+    }
+    lines = []
+    kwargs = []
+    for i, param in enumerate(sub.params):
+        var = f"_v{i}"
+        kwargs.append(f"{param.name}={var}")
+        if param.depend:
+            namespace[f"_d{i}"] = param.depend
+            lines.append(f"        {var} = await _d{i}(context)")
+            continue
+        namespace[f"_p{i}"] = param
+        lines.append(f"        if {param.name!r} in context:")
+        lines.append(f"            {var} = context[{param.name!r}]")
+        for j, provider in enumerate(param.providers):
+            namespace[f"_p{i}_{j}"] = provider
+            lines.append(f"        elif ({var} := await _p{i}_{j}(context)) is not None:")
+            lines.append(f"            if {var}.__class__ is Force:")
+            lines.append(f"                {var} = {var}.value")
+        lines.append("        else:")
+        if param.default is not Empty:
+            lines.append(f"            {var} = _p{i}.default")
+        else:
+            lines.append(f"            raise UnresolvedRequirement(_p{i}.name, _p{i}.annotation, _p{i}.default, _p{i}.providers)")
+    call = f"_target({', '.join(kwargs)})"
+    if sub.is_cm:
+        call = f"        result = await context[STACK].enter_async_context({call})"
+    elif sub.is_agen:
+        call = f"        result = {call}"
+    else:
+        call = f"        result = await {call}"
+    source = _HANDLE_TEMPLATE.format(resolve="\n".join(lines) or "        pass", call=call)
+    exec(compile(source, f"<generated handle of {sub.label}>", "exec"), namespace)
+    return namespace["handle"]
+
+
 class Propagator(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def compose(self) -> Generator[TTarget | Propagator | tuple[TTarget, bool] | tuple[TTarget, bool, int], None, None]: ...
@@ -195,14 +397,16 @@ class Subscriber(Generic[R]):
     callable_target: Callable[..., R]
     priority: int
     providers: list[Provider | ProviderFactory]
-    params: list[CompileParam]
 
     _callable_target: Callable[..., Any]
+    _params: list[CompileParam] | None
 
-    def __init__(self, callable_target: Callable[..., R], *, priority: int = 16, providers: TProviders | None = None, dispose: Callable[[Self], None] | None = None, once: bool = False, skip_req_missing: bool = False, label: str | None = None, _listen: Any = None) -> None:
+    def __init__(self, callable_target: Callable[..., R], *, priority: int = 16, providers: TProviders | None = None, dispose: Callable[[Self], None] | None = None, once: bool = False, skip_req_missing: bool = False, label: str | None = None, codegen: bool = False, executor: ExecutorMode = "thread", lazy: bool = False, _listen: Any = None) -> None:
         self.id = str(uuid4())
         self.priority = priority
         self.skip_req_missing = skip_req_missing
+        self.codegen = codegen
+        self.executor = executor
         self.auxiliaries = {}
         providers = providers or []
         self.providers = [p() if isinstance(p, type) else p for p in providers]
@@ -218,45 +422,119 @@ class Subscriber(Generic[R]):
         self.label = label or callable_target.__name__
         self.is_cm = False
         self.is_agen = False
-        self._recompile()
+        self._params = None
+        # 交由进程池执行的订阅者需要在注册时检查参数，不延迟编译
+        self.lazy = lazy and not is_process_executor(executor)
+        if self.lazy:
+            self.handle = self._handle_lazily  # type: ignore
+        else:
+            self._recompile()
         self._disposes: list[Callable[[Self], None]] = [dispose] if dispose else []
 
         if hasattr(callable_target, "__propagates__"):
             for slot in getattr(callable_target, "__propagates__", []):
                 self.propagates(*slot[0], prepend=slot[1])
 
-        self.available = True
+        self.scope: Scope | None = None
+        self._available = True
         self.once = once
 
         finalize(self, self.dispose)
 
+    @property
+    def _auxiliary_executor(self) -> ExecutorMode:
+        """检查、依赖等附属函数的执行方式，进程池只用于订阅者本身"""
+        return "thread" if is_process_executor(self.executor) else self.executor
+
+    @property
+    def params(self) -> list[CompileParam]:
+        """编译后的参数列表；延迟编译的订阅者在首次访问时编译"""
+        if self._params is None:
+            self._build()
+        return self._params  # type: ignore
+
+    @params.setter
+    def params(self, value: list[CompileParam]):
+        self._params = value
+
+    def compile(self) -> bool:
+        """立即编译延迟编译的订阅者，已编译时返回 False"""
+        if self._params is not None:
+            return False
+        self._build()
+        return True
+
+    async def _handle_lazily(self, context: Contexts, inner: bool = False):
+        self.compile()
+        return await self.handle(context, inner)
+
     def _recompile(self, new_providers: Sequence[Provider | ProviderFactory] | None = None):
-        self.is_cm = False
-        self.is_agen = False
         if new_providers:
             self.providers.extend(new_providers)
-        self.params = _compile(self.callable_target, self.providers)
+        if self._params is None and self.lazy:
+            # 尚未编译时只需将新的 Provider 传递给传播订阅者，编译时自然会用上
+            if new_providers:
+                for propagate in self._propagates:
+                    propagate._recompile(new_providers)
+            return
+        self._build(new_providers)
+
+    def _build(self, new_providers: Sequence[Provider | ProviderFactory] | None = None):
+        self.is_cm = False
+        self.is_agen = False
+        self._params = _compile(self.callable_target, self.providers, self._auxiliary_executor)
+        if is_process_executor(self.executor):
+            to_async, to_async_gen = partial(run_in_process, executor=self.executor if isinstance(self.executor, Executor) else None), _reject_process
+            if not is_async(self.callable_target):
+                _check_process_params(self)
+        elif isinstance(self.executor, Executor):
+            to_async, to_async_gen = partial(run_in_executor, self.executor), partial(run_in_executor_generator, self.executor)
+        elif self.executor == "inline":
+            to_async, to_async_gen = run_inline, run_inline_generator
+        else:
+            to_async, to_async_gen = run_sync, run_sync_generator
         if hasattr(self.callable_target, "__code__") and self.callable_target.__code__.co_name == "helper" and self.callable_target.__code__.co_filename.endswith("contextlib.py"):  # pragma: no cover
             self.is_cm = True
             wrapped = getattr(self.callable_target, "__wrapped__")
             if is_gen_callable(wrapped):
-                self._callable_target = asynccontextmanager(run_sync_generator(wrapped))
+                self._callable_target = asynccontextmanager(to_async_gen(wrapped))
             else:
                 self._callable_target = asynccontextmanager(wrapped)  # type: ignore
         elif is_async_gen_callable(self.callable_target):  # pragma: no cover
             self._callable_target = self.callable_target  # type: ignore
             self.is_agen = True
         elif is_gen_callable(self.callable_target):  # pragma: no cover
-            self._callable_target = run_sync_generator(self.callable_target)
+            self._callable_target = to_async_gen(self.callable_target)
             self.is_agen = True
         else:
-            self._callable_target = self.callable_target if is_async(self.callable_target) else run_sync(self.callable_target)  # noqa: E501 # type: ignore
+            self._callable_target = self.callable_target if is_async(self.callable_target) else to_async(self.callable_target)  # noqa: E501 # type: ignore
         if new_providers:
             for p in self.params:
                 if p.depend:
                     p.depend.sub._recompile(new_providers)
             for propagate in self._propagates:
                 propagate._recompile(new_providers)
+        if self.codegen:
+            self.handle = _generate_handle(self)  # type: ignore
+        else:
+            self.__dict__.pop("handle", None)
+
+    @property
+    def available(self) -> bool:
+        """订阅者是否可用；所属作用域被禁用时同样视为不可用"""
+        return self._available and (self.scope is None or self.scope.available)
+
+    @available.setter
+    def available(self, value: bool):
+        self._available = value
+
+    @property
+    def resolution(self) -> dict[str, tuple[int, int]]:
+        """各参数按事件类型记录的 Provider 的命中与未命中次数
+
+        开启 `codegen` 的订阅者按优先级内联调用 Provider，不使用该记录
+        """
+        return {param.name: (param.hits, param.misses) for param in self._params or ()}
 
     def __call__(self, *args, **kwargs) -> R:  # pragma: no cover
         return self.callable_target(*args, **kwargs)
@@ -304,12 +582,12 @@ class Subscriber(Generic[R]):
         token = current_subscriber.set(self)
         if not inner:
             context[SUBSCRIBER] = self
-            context[STACK] = AsyncExitStack()
+            context[STACK] = _ExitStack()
         try:
             if self._cursor and (ans := await self._run_propagate(context, self._propagates[: self._cursor])):
                 return ans
             arguments = {}  # type: ignore
-            for param in self.params:
+            for param in self._params:  # type: ignore
                 arguments[param.name] = await param.depend(context) if param.depend else await param.solve(context)
             if self.is_cm:
                 stack: AsyncExitStack = context[STACK]
@@ -338,9 +616,10 @@ class Subscriber(Generic[R]):
         finally:
             current_subscriber.reset(token)  # type: ignore
             if not inner:
-                if STACK in context:  # pragma: no cover
+                # 未压入任何回调的栈无需展开；由外部放入的其他 AsyncExitStack 总是展开
+                if STACK in context and getattr(exit_stack := context[STACK], "used", True):  # pragma: no cover
                     typ, e, tb = sys.exc_info()
-                    await context[STACK].__aexit__(typ, e, tb)
+                    await exit_stack.__aexit__(typ, e, tb)
                 context.clear()
             if self.once:
                 self.dispose()
@@ -415,7 +694,7 @@ class Subscriber(Generic[R]):
                     self._propagates.remove(x)
                     self._cursor -= 1
 
-                sub = Subscriber(callable_target, priority=priority, providers=_providers, dispose=_dispose, once=once, _listen=self._listen)
+                sub = Subscriber(callable_target, priority=priority, providers=_providers, dispose=_dispose, once=once, codegen=self.codegen, executor=self._auxiliary_executor, _listen=self._listen)
                 self._propagates.insert(self._cursor, sub)
                 self._cursor += 1
             else:
@@ -424,7 +703,7 @@ class Subscriber(Generic[R]):
                     self._after_propagates -= 1
 
                 _providers.append(ResultProvider())
-                sub = Subscriber(callable_target, priority=priority, providers=_providers, dispose=_dispose, once=once, _listen=self._listen)
+                sub = Subscriber(callable_target, priority=priority, providers=_providers, dispose=_dispose, once=once, codegen=self.codegen, executor=self._auxiliary_executor, _listen=self._listen)
                 self._propagates.append(sub)
                 self._after_propagates += 1
             return sub.dispose
@@ -490,13 +769,13 @@ class ParamDepend(Depend):
         self.param = CompileParam(name, anno, default, [], None, None)
         super().__init__(self.param.solve, cache)
 
-    def fork(self, provider: list[Provider | ProviderFactory]):
+    def fork(self, provider: list[Provider | ProviderFactory], executor: ExecutorMode = "thread"):
         if hasattr(self, "sub"):  # pragma: no cover
             return self
         self.param.providers.clear()
-        _compile_single(self.param, provider)
+        _compile_single(self.param, provider, executor)
         new = Depend(self.target, self.cache)
-        new.sub = Subscriber(self.target, providers=[provide(Contexts, call=lambda c: c)])
+        new.sub = Subscriber(self.target, providers=[provide(Contexts, call=lambda c: c)], executor=executor)
         return new
 
 
@@ -3,19 +3,29 @@ from __future__ import annotations
 import asyncio
 import atexit
 import inspect
-from collections.abc import Awaitable, Callable, Hashable, Iterable, Coroutine
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable, Coroutine, Generator, Hashable, Iterable
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Any, Generic, Protocol, TypeAlias, overload
-from typing_extensions import TypeVar
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Generic, Literal, Protocol, TypeAlias, overload
+from typing_extensions import ParamSpec, TypeVar
 from weakref import WeakKeyDictionary
 
 from tarina import is_async
 
+if TYPE_CHECKING:
+    from .admission import AdmissionController
+
 T = TypeVar("T")
 T_Weak = TypeVar("T_Weak", bound=Hashable | Callable)
 
 TTarget: TypeAlias = Callable[..., Awaitable[T]] | Callable[..., T]
 TCallable = TypeVar("TCallable", bound=Callable[..., Any])
+P = ParamSpec("P")
+ExecutorMode: TypeAlias = Literal["inline", "thread", "process"] | Executor
+"""同步函数的执行方式：`inline` 直接在事件循环中调用，`thread` 交由事件循环的默认线程池执行，
+`process` 交由共享进程池执行，传入 `Executor` 时交由该执行器执行"""
 
 
 @dataclass(slots=True, frozen=True)
@@ -42,6 +52,33 @@ async def run_always_await(target: Callable[..., Any] | Callable[..., Awaitable[
     return obj
 
 
+def run_inline(call: Callable[P, T]) -> Callable[P, Coroutine[None, None, T]]:
+    """将同步函数包装为异步函数，调用直接发生在事件循环中
+
+    适用于不会阻塞的轻量函数，省去线程池调度的开销
+    """
+
+    @wraps(call)
+    async def _wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        result = call(*args, **kwargs)
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    return _wrapper
+
+
+def run_inline_generator(call: Callable[P, Generator[T, Any, Any]]) -> Callable[P, AsyncGenerator[T, None]]:
+    """将同步生成器函数包装为异步生成器函数，迭代直接发生在事件循环中"""
+
+    @wraps(call)
+    async def _wrapper(*args: P.args, **kwargs: P.kwargs) -> AsyncGenerator[T, None]:
+        for item in call(*args, **kwargs):
+            yield item
+
+    return _wrapper
+
+
 def _delete(mapping, key):
     if key in mapping:
         del mapping[key]
@@ -134,9 +171,86 @@ class DisposableList(Generic[T_Weak]):
         raise TypeError(f"Invalid index type: {type(index)}")
 
 
+class Limiter:
+    """限制同时处于分发中的事件数量，`limit` 为 None 时不作限制
+
+    等待者按先来先得的顺序获得名额
+    """
+
+    def __init__(self, limit: int | None = None):
+        self._limit = limit
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def limit(self) -> int | None:
+        return self._limit
+
+    @limit.setter
+    def limit(self, value: int | None):
+        self._limit = value
+        self._wake()
+
+    def _available(self) -> bool:
+        return self._limit is None or self.in_flight < self._limit
+
+    def _wake(self):
+        while self._waiters and self._available():
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.in_flight += 1
+                fut.set_result(None)
+
+    def hold(self):
+        """无视限制占用一个名额"""
+        self.in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """尝试占用一个名额，名额已满时立即返回 False"""
+        if self._waiters or not self._available():
+            return False
+        self.in_flight += 1
+        return True
+
+    async def acquire(self):
+        """占用一个名额，名额已满时等待"""
+        if self.try_acquire():
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()
+            elif fut in self._waiters:
+                self._waiters.remove(fut)
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(in_flight={self.in_flight}, limit={self._limit})"
+
+
 class _EventSystem:
     ref_tasks: set[asyncio.Task] = set()
     loop: asyncio.AbstractEventLoop | None = None
+    version: int = 0
+    """订阅者注册表的版本号，注册表发生变化时递增"""
+    limiter: Limiter = Limiter()
+    """全局的在途事件限制"""
+    admission: AdmissionController | None = None
+    """过载时的准入控制，为 None 时接纳所有事件"""
+    exit_hooks: list[Callable[[], Awaitable[Any]]] = []
+    """退出时、取消剩余任务之前执行的钩子"""
+
+
+def bump_version():
+    """标记订阅者注册表已变更，使已缓存的分发计划失效"""
+    _EventSystem.version += 1
 
 
 def add_task(coro: Coroutine[Any, Any, T]) -> asyncio.Task[T]:
@@ -153,6 +267,10 @@ def set_event_loop(loop: asyncio.AbstractEventLoop):  # pragma: no cover
 
 @atexit.register
 def _cleanup():  # pragma: no cover
+    loop = _EventSystem.loop
+    if loop and not loop.is_closed() and not loop.is_running():
+        # 事件循环仍可用时先执行退出钩子，例如冲刷批量订阅者的缓冲，避免其中的事件随任务取消而丢失
+        loop.run_until_complete(asyncio.gather(*(hook() for hook in _EventSystem.exit_hooks), return_exceptions=True))
     for task in _EventSystem.ref_tasks:
         if not task.done() and not task.get_loop().is_closed():
             task.cancel()
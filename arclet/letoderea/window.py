@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from .context import EVENT, Contexts
+from .core import make_event, publish
+from .publisher import Publisher
+from .scope import on, use
+from .utils import _EventSystem
+
+T = TypeVar("T")
+A = TypeVar("A")
+
+
+@make_event
+class WindowClosed:
+    """时间窗口关闭时发布的聚合事件"""
+
+    window: str
+    key: Any
+    start: float
+    end: float
+    count: int
+    value: Any
+
+
+class Window(Publisher[WindowClosed], Generic[T, A]):
+    """按键与时间窗口增量聚合来源事件，窗口关闭时为其中的每个键发布一个 `WindowClosed` 事件
+
+    `step` 为空时为长度 `size` 的滚动窗口，否则为每隔 `step` 秒开启一个的滑动窗口，窗口起点对齐到 `step` 的整数倍。
+    每个 (窗口, 键) 仅保存事件数与 `aggregate` 的累积值；状态数达到 `max_state` 后，
+    需要新状态的事件被丢弃并计入 `shed`。可以通过 `use(window)` 订阅本窗口的聚合事件。
+    """
+
+    def __init__(
+        self,
+        source: type[T] | Publisher[T],
+        size: float,
+        step: float | None = None,
+        *,
+        key: Callable[[T], Hashable] | None = None,
+        aggregate: Callable[[A, T], A] | None = None,
+        initial: Callable[[], A] | None = None,
+        max_state: int = 100_000,
+        clock: Callable[[], float] = time.time,
+        id_: str | None = None,
+    ):
+        step = step or size
+        if not 0 < step <= size:
+            raise ValueError("Window requires 0 < step <= size")
+        source_id = source.id if isinstance(source, Publisher) else getattr(source, "__publisher__", source.__name__)
+        super().__init__(
+            WindowClosed,
+            id_ or f"$window:{source_id}:{size}:{step}",
+            WindowClosed.__context_gather__,  # type: ignore
+            lambda e: e.window == self.id,
+        )
+        self.size = size
+        self.step = step
+        self.key = key
+        self.aggregate = aggregate
+        self.initial = initial
+        self.max_state = max_state
+        """(窗口, 键) 状态数的上限"""
+        self.clock = clock
+        self.state = 0
+        """当前保存的 (窗口, 键) 状态数"""
+        self.windows: dict[int, dict[Hashable, list[Any]]] = {}
+        """以窗口序号为键的未关闭窗口，窗口起点为 `序号 * step`"""
+        self._span = math.ceil(size / step)
+        self._timer: asyncio.TimerHandle | None = None
+
+        def feed(ctx: Contexts):
+            self.add(ctx[EVENT])
+
+        if isinstance(source, Publisher):
+            self.subscriber = use(source, feed, executor="inline")
+        else:
+            self.subscriber = on(source, feed, executor="inline")
+
+    def add(self, event: T):
+        """将事件计入其所属的所有窗口"""
+        now = self.clock()
+        key = self.key(event) if self.key else None
+        last = math.floor(now / self.step)
+        shed = False
+        for index in range(last - self._span + 1, last + 1):
+            if index * self.step + self.size <= now:
+                continue
+            if (bucket := self.windows.get(index)) is None:
+                bucket = self.windows[index] = {}
+            if (slot := bucket.get(key)) is None:
+                if self.state >= self.max_state:
+                    shed = True
+                    continue
+                slot = bucket[key] = [0, self.initial() if self.initial else None]
+                self.state += 1
+            slot[0] += 1
+            if self.aggregate:
+                slot[1] = self.aggregate(slot[1], event)
+        if shed:
+            self.shed += 1
+        if self._timer is None:
+            self._schedule(now)
+
+    def _schedule(self, now: float):
+        if not self.windows:
+            return
+        end = min(self.windows) * self.step + self.size
+        loop = _EventSystem.loop or asyncio.get_running_loop()
+        self._timer = loop.call_later(max(0.0, end - now), self._close_due)
+
+    def _close_due(self):
+        self._timer = None
+        now = self.clock()
+        for index in sorted(i for i in self.windows if i * self.step + self.size <= now):
+            self._emit(index, self.windows.pop(index))
+        self._schedule(now)
+
+    def _emit(self, index: int, bucket: dict[Hashable, list[Any]]) -> list[asyncio.Future[None]]:
+        self.state -= len(bucket)
+        start = index * self.step
+        return [publish(WindowClosed(self.id, key, start, start + self.size, count, value)) for key, (count, value) in bucket.items()]
+
+    def flush(self) -> list[asyncio.Future[None]]:
+        """立即关闭所有未关闭的窗口并发布其聚合结果"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        windows, self.windows = self.windows, {}
+        return [task for index in sorted(windows) for task in self._emit(index, windows[index])]
+
+    async def close(self):
+        """停止接收事件，发布所有未关闭窗口的聚合结果并等待其处理完成，随后注销该窗口"""
+        self.subscriber.dispose()
+        await asyncio.gather(*self.flush())
+        self.dispose()
+
+    def dispose(self):
+        """注销该窗口，丢弃未关闭的窗口"""
+        self.subscriber.dispose()
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self.windows.clear()
+        self.state = 0
+        super().dispose()
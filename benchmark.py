@@ -66,6 +66,25 @@ print("RUN 2:")
 print(f"used {n/10e8} s, {count*10e8/n}o/s")
 print(f"{n / count} ns per loop with {count} loops")
 
+
+@on(TestEvent, codegen=True)
+async def sub_codegen(aa):
+    pass
+
+
+async def main1_codegen():
+    for _ in range(count):
+        await sub_codegen.handle(ctx.copy())
+
+
+s = time.perf_counter_ns()
+loop.run_until_complete(main1_codegen())
+e = time.perf_counter_ns()
+n = e - s
+print("RUN 2 (codegen):")
+print(f"used {n/10e8} s, {count*10e8/n}o/s")
+print(f"{n / count} ns per loop with {count} loops")
+
 slot = SubscriberSlot(sub, '$event:__main__.TestEvent', 16)
 
 
@@ -0,0 +1,56 @@
+"""突发事件下 publish、publish_wait 与准入控制的内存占用对比
+
+运行: python -m benchmarks.backpressure
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import tracemalloc
+
+from arclet.letoderea import AdmissionController, define, make_event, on, publish, publish_wait
+from arclet.letoderea.scope import configure
+from arclet.letoderea.utils import _EventSystem
+
+count = 20_000
+
+
+@make_event
+class BurstEvent:
+    index: int
+
+
+@on(BurstEvent)
+async def handler(index: int):
+    await asyncio.sleep(0)
+
+
+async def burst(name: str, wait: bool):
+    tracemalloc.start()
+    peak_tasks = 0
+    s = time.perf_counter_ns()
+    for i in range(count):
+        if wait:
+            await publish_wait(BurstEvent(i))
+        else:
+            publish(BurstEvent(i))
+        peak_tasks = max(peak_tasks, len(_EventSystem.ref_tasks))
+    while _EventSystem.ref_tasks:
+        await asyncio.sleep(0.01)
+    n = time.perf_counter_ns() - s
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name}: used {n / 1e9:.4f} s, {count * 1e9 / n:.0f} o/s, peak {peak_tasks} tasks, peak {peak / 2**20:.1f} MiB")
+
+
+async def main():
+    await burst("publish", False)
+    configure(max_in_flight=1000)
+    await burst("publish_wait (limit 1000)", True)
+    configure(admission=AdmissionController(max_in_flight=1000))
+    await burst("publish with admission (limit 1000)", False)
+    print(f"shed: {define(BurstEvent).shed}")
+    configure(max_in_flight=None, admission=None)
+
+
+asyncio.run(main())
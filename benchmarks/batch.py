@@ -0,0 +1,55 @@
+"""逐个事件写入与批量订阅者写入 SQLite 的吞吐量对比
+
+运行: python -m benchmarks.batch
+"""
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from arclet.letoderea import Scope, flush_batches, make_event, publish
+
+count = 20_000
+db = sqlite3.connect(Path(tempfile.mkdtemp()) / "rows.db")
+db.execute("CREATE TABLE rows (id INTEGER, name TEXT)")
+
+
+@make_event
+class RowEvent:
+    id: int
+    name: str
+
+
+def insert_one(id: int, name: str):
+    db.execute("INSERT INTO rows VALUES (?, ?)", (id, name))
+    db.commit()
+
+
+def insert_many(id: list[int], name: list[str]):
+    db.executemany("INSERT INTO rows VALUES (?, ?)", zip(id, name))
+    db.commit()
+
+
+def report(name: str, n: int, ops: int):
+    print(f"{name}: used {n / 1e9:.4f} s, {ops * 1e9 / n:.0f} o/s, {n / ops:.0f} ns per op")
+
+
+async def run(name: str, **kwargs):
+    scope = Scope.of(name)
+    scope.register(insert_many if "batch_size" in kwargs else insert_one, RowEvent, executor="inline", **kwargs)
+    s = time.perf_counter_ns()
+    await asyncio.gather(*(publish(RowEvent(i, f"name{i}"), scope) for i in range(count)))
+    await flush_batches()
+    report(name, time.perf_counter_ns() - s, count)
+    scope.dispose()
+
+
+async def main():
+    await run("per event")
+    await run("batch_size=500", batch_size=500, max_delay=0.05)
+
+
+asyncio.run(main())
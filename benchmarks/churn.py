@@ -0,0 +1,80 @@
+"""注册 / 注销订阅者的抖动基准测试
+
+运行: python -m benchmarks.churn
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+from arclet.letoderea import Scope, make_event
+from arclet.letoderea.scope import SubscriberSlot, _slot_order
+from arclet.letoderea.subscriber import Subscriber
+
+count = 100_000
+
+
+@make_event
+class ChurnEvent:
+    foo: str
+
+
+async def handler(foo: str): ...
+
+
+def report(name: str, n: int, ops: int):
+    print(f"{name}: used {n / 1e9:.4f} s, {ops * 1e9 / n:.0f} o/s, {n / ops:.0f} ns per op")
+
+
+async def main():
+    pub_id = ChurnEvent.__publisher__  # type: ignore
+    subs = [Subscriber(handler) for _ in range(count)]
+    scope = Scope.of("churn")
+
+    s = time.perf_counter_ns()
+    for sub in subs:
+        scope.add_slot(SubscriberSlot(sub, pub_id, sub.priority, next(_slot_order)))
+    report(f"add {count} slots", time.perf_counter_ns() - s, count)
+
+    order = subs.copy()
+    random.shuffle(order)
+    s = time.perf_counter_ns()
+    for sub in order:
+        scope.remove_subscriber(sub)
+    report(f"remove {count} slots", time.perf_counter_ns() - s, count)
+
+    for sub in subs:
+        scope.add_slot(SubscriberSlot(sub, pub_id, sub.priority, next(_slot_order)))
+    s = time.perf_counter_ns()
+    for sub in order[: count // 10]:
+        scope.remove_subscriber(sub)
+        scope.add_slot(SubscriberSlot(sub, pub_id, sub.priority, next(_slot_order)))
+    report(f"churn {count // 10} slots with {count} resident", time.perf_counter_ns() - s, count // 10)
+
+    s = time.perf_counter_ns()
+    for sub in order[: count // 10]:
+        scope.remove_subscriber(sub)
+        scope.buckets([pub_id])
+        scope.add_slot(SubscriberSlot(sub, pub_id, sub.priority, next(_slot_order)))
+        scope.buckets([pub_id])
+    report(f"churn {count // 10} slots interleaved with lookup, {count} resident", time.perf_counter_ns() - s, count // 10)
+
+    s = time.perf_counter_ns()
+    for _ in range(1000):
+        scope.disable()
+        scope.enable()
+    report(f"toggle scope with {count} resident", time.perf_counter_ns() - s, 2000)
+    scope.dispose()
+
+    scope = Scope.of("churn_register")
+    s = time.perf_counter_ns()
+    registered = [scope.register(handler, ChurnEvent) for _ in range(count // 10)]
+    report(f"register {count // 10} subscribers", time.perf_counter_ns() - s, count // 10)
+    s = time.perf_counter_ns()
+    for sub in registered:
+        sub.dispose()
+    report(f"dispose {count // 10} subscribers", time.perf_counter_ns() - s, count // 10)
+
+
+asyncio.run(main())
@@ -0,0 +1,54 @@
+"""同步订阅者在各执行方式下的基准测试
+
+运行: python -m benchmarks.executor
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from arclet.letoderea import Scope, enter_if, make_event, thread_pool
+from arclet.letoderea.core import run_handler
+
+count = 20_000
+admins = {1, 2, 3}
+
+
+@make_event
+class MessageEvent:
+    user_id: int
+    text: str
+
+
+def handler(user_id: int, text: str):
+    return f"{user_id}: {text}"
+
+
+def report(name: str, n: int, ops: int):
+    print(f"{name}: used {n / 1e9:.4f} s, {ops * 1e9 / n:.0f} o/s, {n / ops:.0f} ns per op")
+
+
+async def main():
+    scope = Scope.of("executor")
+    event = MessageEvent(1, "hello")
+    pool = thread_pool(4)
+    for name, mode in (("thread", "thread"), ("pool", pool), ("inline", "inline")):
+        sub = scope.register(handler, MessageEvent, executor=mode)
+        s = time.perf_counter_ns()
+        for _ in range(count):
+            await run_handler(sub, event)
+        report(f"{name}: sync subscriber", time.perf_counter_ns() - s, count)
+        sub.dispose()
+
+        sub = scope.register(enter_if(lambda user_id: user_id in admins)(handler), MessageEvent, executor=mode)
+        s = time.perf_counter_ns()
+        for _ in range(count):
+            await run_handler(sub, event)
+        report(f"{name}: sync subscriber with sync check", time.perf_counter_ns() - s, count)
+        sub.dispose()
+    print(f"pool: {pool.stats()}")
+    pool.shutdown()
+    scope.dispose()
+
+
+asyncio.run(main())
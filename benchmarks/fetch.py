@@ -0,0 +1,42 @@
+"""经由 Publisher 事件队列分发事件的吞吐量基准测试
+
+运行: python -m benchmarks.fetch
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from arclet.letoderea import define, make_event, on
+from arclet.letoderea.core import setup_fetch
+
+count = 10_000
+
+
+@make_event
+class QueuedEvent:
+    index: int
+
+
+@on(QueuedEvent)
+async def handler(index: int): ...
+
+
+def report(name: str, n: int, ops: int):
+    print(f"{name}: used {n / 1e9:.4f} s, {ops * 1e9 / n:.0f} o/s, {n / ops:.0f} ns per op")
+
+
+async def main():
+    queue = define(QueuedEvent).event_queue
+    for workers in (1, 4):
+        tasks = setup_fetch(workers)
+        s = time.perf_counter_ns()
+        for i in range(count):
+            queue.put_nowait(QueuedEvent(i))
+        await queue.join()
+        report(f"{count} queued events with {workers} workers", time.perf_counter_ns() - s, count)
+        for task in tasks:
+            task.cancel()
+
+
+asyncio.run(main())
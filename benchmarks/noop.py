@@ -0,0 +1,55 @@
+"""无人订阅的事件发布的开销
+
+运行: python -m benchmarks.noop
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from functools import partial
+
+from arclet.letoderea import make_event, on, post, publish
+from arclet.letoderea.core import _spawn, dispatch
+from arclet.letoderea.utils import _EventSystem
+
+count = 200_000
+
+
+@make_event
+class DebugEvent:
+    message: str
+
+
+@make_event
+class ChatEvent:
+    message: str
+
+
+def report(name: str, n: int):
+    print(f"{name}: used {n / 1e9:.4f} s, {count * 1e9 / n:.0f} o/s, {n / count:.0f} ns per op")
+
+
+async def run(name: str, call):
+    event = DebugEvent("debug")
+    s = time.perf_counter_ns()
+    for _ in range(count):
+        call(event)
+    while _EventSystem.ref_tasks:
+        await asyncio.sleep(0)
+    report(name, time.perf_counter_ns() - s)
+
+
+async def main():
+    # 不经快速路径，总是创建分发任务
+    await run("task per event", lambda event: _spawn(event, partial(dispatch, event), ()))
+    await run("publish (no subscriber)", publish)
+    await run("post (no subscriber)", post)
+
+    # 其他事件存在订阅者时，仍需查询事件所属的 Publisher
+    @on(ChatEvent)
+    async def chat(message: str): ...
+
+    await run("publish (no subscriber, others subscribed)", publish)
+
+
+asyncio.run(main())
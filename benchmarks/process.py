@@ -0,0 +1,56 @@
+"""CPU 密集型订阅者交由进程池执行时，吞吐量随工作进程数变化的基准测试
+
+运行: python -m benchmarks.process
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from arclet.letoderea import Scope, make_event, process_pool
+from arclet.letoderea.core import run_handler
+
+count = 64
+
+
+@make_event
+class PayloadEvent:
+    payload: int
+
+
+def score(payload: int):
+    total = 0
+    for i in range(payload):
+        total += i * i % 7
+    return total
+
+
+def report(name: str, n: int, ops: int):
+    print(f"{name}: used {n / 1e9:.4f} s, {ops * 1e9 / n:.1f} o/s, {n / ops / 1e6:.2f} ms per op")
+
+
+async def run(name: str, scope: Scope, executor):
+    sub = scope.register(score, PayloadEvent, executor=executor)
+    event = PayloadEvent(200_000)
+    await asyncio.gather(*(run_handler(sub, event) for _ in range(4)))  # 预热工作进程
+    s = time.perf_counter_ns()
+    await asyncio.gather(*(run_handler(sub, event) for _ in range(count)))
+    report(name, time.perf_counter_ns() - s, count)
+    sub.dispose()
+
+
+async def main():
+    print(f"cpu count: {os.cpu_count()}")
+    scope = Scope.of("process")
+    await run("inline", scope, "inline")
+    for workers in (1, 2, 4, 8):
+        pool = process_pool(workers)
+        await run(f"process x{workers}", scope, pool)
+        print(f"process x{workers}: {pool.stats()}")
+        pool.shutdown()
+    scope.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""注册大量使用 `Annotated` 元数据与 `deref` 默认值的订阅者时的耗时与内存
+
+这些参数在编译时各自通过 `provide` 生成 Provider。
+
+运行: python -m benchmarks.provide
+"""
+from __future__ import annotations
+
+import gc
+import time
+import tracemalloc
+from typing import Annotated
+
+from arclet.letoderea import Scope, deref, make_event
+
+count = 10_000
+
+
+@make_event
+class ProvideEvent:
+    user: str
+    channel: int
+
+
+def handler(
+    name: Annotated[str, "user"],
+    length: Annotated[int, lambda ctx: len(ctx["user"])],
+    upper: str = deref(ProvideEvent).user.upper(),  # type: ignore
+    channel: int = deref(ProvideEvent).channel,  # type: ignore
+): ...
+
+
+def register(scope: Scope):
+    for _ in range(count):
+        scope.register(handler, ProvideEvent)
+
+
+def main():
+    scope = Scope.of("provide")
+    s = time.perf_counter_ns()
+    register(scope)
+    n = time.perf_counter_ns() - s
+    print(f"register {count} subscribers: used {n / 1e9:.4f} s, {n / count / 1e3:.1f} us per op")
+    scope.dispose()
+    gc.collect()
+
+    scope = Scope.of("provide")
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    register(scope)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"register {count} subscribers: retained {(after - before) / 2**20:.1f} MiB, {(after - before) / count / 1024:.2f} KiB per subscriber")
+    scope.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""大量延迟发布时，asyncio.sleep 任务与时间轮的内存占用与调度开销对比
+
+运行: python -m benchmarks.schedule
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import tracemalloc
+
+from arclet.letoderea import make_event, publish, publish_after
+from arclet.letoderea.schedule import timer_wheel
+from arclet.letoderea.utils import add_task
+
+count = 200_000
+
+
+@make_event
+class ReminderEvent:
+    index: int
+
+
+async def delayed(delay: float, event: ReminderEvent):
+    await asyncio.sleep(delay)
+    publish(event)
+
+
+def report(name: str, n: int, peak: int):
+    print(f"{name}: scheduled {count} in {n / 1e9:.3f} s, {n / count:.0f} ns per op, peak {peak / 2**20:.1f} MiB, {peak / count:.0f} B per event")
+
+
+async def main():
+    events = [ReminderEvent(i) for i in range(count)]
+
+    tracemalloc.start()
+    s = time.perf_counter_ns()
+    tasks = [add_task(delayed(60 + i % 600, event)) for i, event in enumerate(events)]
+    await asyncio.sleep(0)
+    n = time.perf_counter_ns() - s
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report("asyncio.sleep tasks", n, peak)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    del tasks
+
+    tracemalloc.start()
+    s = time.perf_counter_ns()
+    handles = [publish_after(60 + i % 600, event) for i, event in enumerate(events)]
+    await asyncio.sleep(0)
+    n = time.perf_counter_ns() - s
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    report("timer wheel", n, peak)
+    for handle in handles:
+        handle()
+    assert timer_wheel.size == 0
+
+
+asyncio.run(main())
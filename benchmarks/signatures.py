@@ -0,0 +1,109 @@
+"""从代码对象直接还原参数对冷启动注册耗时的影响
+
+每一轮都在新的进程中导入生成的插件模块并注册全部订阅者，取多轮中的最短耗时；
+`inspect` 一栏将参数解析换回 `tarina.signatures` 作为对照。
+
+运行: python -m benchmarks.signatures
+"""
+from __future__ import annotations
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+count = 2000
+names = 400
+repeat = 8
+
+PLUGIN = """\
+from __future__ import annotations
+
+from arclet.letoderea import Provider, provide
+from arclet.letoderea.context import Contexts
+
+
+class Session:
+    pass
+
+
+class SessionProvider(Provider[Session]):
+    cacheable = True
+
+    async def __call__(self, context: Contexts):
+        return Session()
+
+
+class FlagProvider(Provider[bool]):
+    cacheable = True
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    def validate(self, param):
+        return param.name == self.name
+
+    async def __call__(self, context: Contexts):
+        return True
+
+    def __repr__(self):
+        return f"FlagProvider({{self.name!r}})"
+
+
+providers = [
+    *(provide(str, f"key{{i}}", call=f"key{{i}}") for i in range(20)),
+    *(FlagProvider(f"flag{{i}}") for i in range(19)),
+    SessionProvider(),
+]
+
+{handlers}
+"""
+
+
+def generate(directory: Path):
+    handlers = "\n\n".join(
+        f"async def handler{i}(user: str, channel: int, session: Session, key{i % 20}: str, flag{i % 19}: bool, arg{i % names}: int = 0): ..."
+        for i in range(count)
+    )
+    (directory / "signature_plugins.py").write_text(PLUGIN.format(handlers=handlers), "utf-8")
+
+
+def phase(directory: str, mode: str):
+    sys.path.insert(0, directory)
+    from tarina import signatures
+
+    from arclet.letoderea import Scope, subscriber
+
+    import signature_plugins as plugins
+
+    if mode == "inspect":
+        subscriber._signatures = signatures
+    scope = Scope.of("startup")
+    scope.providers.extend(plugins.providers)
+    handlers = [getattr(plugins, f"handler{i}") for i in range(count)]
+    s = time.perf_counter_ns()
+    for handler in handlers:
+        scope.register(handler)
+    print(time.perf_counter_ns() - s)
+
+
+def run(directory: str, mode: str):
+    output = subprocess.run([sys.executable, "-m", "benchmarks.signatures", directory, mode], check=True, capture_output=True, text=True).stdout
+    return int(output)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        generate(Path(directory))
+        for mode in ("inspect", "code"):
+            n = min(run(directory, mode) for _ in range(repeat))
+            print(f"{mode}: register {count} subscribers used {n / 1e9:.4f} s, {n / count / 1e3:.1f} us per op")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        phase(sys.argv[1], sys.argv[2])
+    else:
+        main()
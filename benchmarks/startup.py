@@ -0,0 +1,80 @@
+"""大量订阅者与 Provider 时的注册（启动）耗时
+
+运行: python -m benchmarks.startup
+"""
+from __future__ import annotations
+
+import time
+
+from arclet.letoderea import Param, Provider, Scope, make_event, provide
+from arclet.letoderea.context import Contexts
+
+count = 5000
+
+
+@make_event
+class StartupEvent:
+    user: str
+    channel: int
+
+
+class Session:
+    pass
+
+
+class SessionProvider(Provider[Session]):
+    cacheable = True
+
+    async def __call__(self, context: Contexts):
+        return Session()
+
+
+class FlagProvider(Provider[bool]):
+    cacheable = True
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+
+    def validate(self, param: Param):
+        return param.name == self.name
+
+    async def __call__(self, context: Contexts):
+        return True
+
+
+providers = [
+    *(provide(str, f"key{i}", call=f"key{i}") for i in range(20)),
+    *(FlagProvider(f"flag{i}") for i in range(19)),
+    SessionProvider(),
+]
+
+
+async def handler(user: str, channel: int, session: Session, key3: str, flag7: bool, ctx: Contexts): ...
+
+
+def report(name: str, n: int, ops: int):
+    print(f"{name}: used {n / 1e9:.4f} s, {ops * 1e9 / n:.0f} o/s, {n / ops / 1e3:.1f} us per op")
+
+
+def run(lazy: bool):
+    scope = Scope.of("startup")
+    scope.providers.extend(providers)
+    s = time.perf_counter_ns()
+    for _ in range(count):
+        scope.register(handler, StartupEvent, lazy=lazy)
+    report(f"register {count} subscribers with {len(providers)} scope providers{' (lazy)' if lazy else ''}", time.perf_counter_ns() - s, count)
+    if lazy:
+        s = time.perf_counter_ns()
+        scope.warmup()
+        report(f"warmup {count} lazy subscribers", time.perf_counter_ns() - s, count)
+    scope.dispose()
+
+
+def main():
+    run(False)
+    run(True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""大量会话同时等待时，逐个注册订阅者的 StepOut 与按键路由的 StepOut 的对比
+
+运行: python -m benchmarks.step_out
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from arclet.letoderea import make_event, publish, step_out
+
+sessions = 1000
+
+
+@make_event
+class ReplyEvent:
+    session: int
+    msg: str
+
+
+async def reply(session: int, msg: str):
+    return msg
+
+
+def report(name: str, n: int):
+    print(f"{name}: {sessions} sessions answered in {n / 1e9:.3f} s, {n / sessions / 1e3:.1f} us per session")
+
+
+async def run(name: str, make_waiter):
+    waiters = [asyncio.create_task(make_waiter(i)) for i in range(sessions)]
+    await asyncio.sleep(0.01)
+    s = time.perf_counter_ns()
+    for i in range(sessions):
+        await publish(ReplyEvent(i, "ok"))
+    await asyncio.gather(*waiters)
+    report(name, time.perf_counter_ns() - s)
+
+
+async def main():
+    async def plain(i: int):
+        # 每个会话一个 StepOut，各自注册订阅者并检查事件是否属于自己
+        async def answer(session: int, msg: str):
+            return msg if session == i else None
+
+        step = step_out(ReplyEvent, answer)
+        return await step.wait(timeout=60)
+
+    await run("step_out per session", plain)
+
+    keyed = step_out(ReplyEvent, reply, key=lambda e: e.session)
+    await run("keyed step_out", lambda i: keyed.wait(i, timeout=60))
+    keyed.dispose()
+
+
+asyncio.run(main())
@@ -0,0 +1,56 @@
+"""窗口聚合阶段的吞吐量与状态数，以 1M 事件/分钟为目标速率
+
+运行: python -m benchmarks.window
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from arclet.letoderea import Window, make_event, publish, use
+
+count = 200_000
+chunk = 10_000
+keys = 1000
+target = 1_000_000 / 60
+
+
+@make_event
+class MetricEvent:
+    key: int
+    value: float
+
+
+async def run(name: str, step: float | None, direct: bool = False):
+    window = Window(MetricEvent, 60.0, step, key=lambda e: e.key, aggregate=lambda acc, e: acc + e.value, initial=float)
+    closed = 0
+
+    @use(window, executor="inline")
+    def collect(count: int):
+        nonlocal closed
+        closed += count
+
+    s = time.perf_counter_ns()
+    if direct:
+        # 仅窗口阶段本身：跳过事件分发，直接计入窗口
+        for j in range(count):
+            window.add(MetricEvent(j % keys, 1.0))
+    else:
+        for i in range(0, count, chunk):
+            await asyncio.gather(*(publish(MetricEvent(j % keys, 1.0)) for j in range(i, i + chunk)))
+    n = time.perf_counter_ns() - s
+    state = window.state
+    await window.close()
+    collect.dispose()
+    rate = count * 1e9 / n
+    print(f"{name}: used {n / 1e9:.2f} s, {rate:.0f} events/s ({rate / target:.1f}x of 1M/min), {state} states, {closed} closed")
+
+
+async def main():
+    await run("tumbling 60s", None)
+    await run("sliding 60s / 10s", 10.0)
+    await run("tumbling 60s (add only)", None, direct=True)
+    await run("sliding 60s / 10s (add only)", 10.0, direct=True)
+
+
+asyncio.run(main())
@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+import arclet.letoderea as le
+
+
+@le.make_event
+class RowEvent:
+    id: int
+    name: str
+
+
+@pytest.mark.asyncio
+async def test_batch_size():
+    batches = []
+
+    @le.on(RowEvent, batch_size=3, max_delay=10)
+    async def insert(id: list[int], name: list[str], event: list[RowEvent]):
+        batches.append((id, name, [e.id for e in event]))
+
+    for i in range(7):
+        await le.publish(RowEvent(i, f"n{i}"))
+    await asyncio.sleep(0)
+    assert batches == [([0, 1, 2], ["n0", "n1", "n2"], [0, 1, 2]), ([3, 4, 5], ["n3", "n4", "n5"], [3, 4, 5])]
+
+    await le.flush_batches()
+    assert batches[-1] == ([6], ["n6"], [6])
+
+
+@pytest.mark.asyncio
+async def test_batch_delay_and_dispose():
+    batches = []
+
+    @le.on(RowEvent, batch_size=100, max_delay=0.05)
+    @le.enter_if(lambda id: id % 2 == 0)
+    def insert(id: list[int]):
+        batches.append(id)
+
+    for i in range(4):
+        await le.publish(RowEvent(i, ""))
+    assert not batches
+    await asyncio.sleep(0.1)
+    assert batches == [[0, 2]]
+
+    await le.publish(RowEvent(4, ""))
+    insert.dispose()
+    await asyncio.sleep(0.05)
+    assert batches == [[0, 2], [4]]
+
+
+@le.make_event
+class SensorEvent:
+    sensor: str
+    value: float
+    count: int
+    ok: bool
+
+
+@pytest.mark.asyncio
+async def test_batch_columns():
+    from arclet.letoderea.batch import np
+
+    batches = []
+
+    @le.on(SensorEvent, batch_size=3, max_delay=10)
+    async def record(readings: le.Columns[SensorEvent], sensor: list[str]):
+        batches.append(readings)
+        assert sensor == readings.sensor
+
+    for i in range(3):
+        await le.publish(SensorEvent(f"s{i}", i * 0.5, i, i % 2 == 0))
+    await asyncio.sleep(0)
+    readings = batches[0]
+    assert len(readings) == 3
+    assert readings.sensor == ["s0", "s1", "s2"]
+    assert list(readings.value) == [0.0, 0.5, 1.0]
+    assert list(readings["count"]) == [0, 1, 2]
+    assert [bool(x) for x in readings.ok] == [True, False, True]
+    if np is None:
+        from array import array
+
+        assert isinstance(readings.value, array) and readings.value.typecode == "d"
+    else:  # pragma: no cover
+        assert isinstance(readings.value, np.ndarray) and readings.value.dtype == np.float64
+
+
+@pytest.mark.asyncio
+async def test_batch_exception_event():
+    errors = []
+
+    @le.on(RowEvent, batch_size=2, max_delay=10)
+    async def insert(id: list[int]):
+        raise ValueError(id)
+
+    @le.on(le.ExceptionEvent)
+    async def report(origin, exception: ValueError, subscriber: le.Subscriber):
+        errors.append((origin, exception.args[0], subscriber))
+
+    await le.publish(RowEvent(1, "a"))
+    await le.publish(RowEvent(2, "b"))
+    await asyncio.sleep(0.01)
+    assert len(errors) == 1
+    origin, ids, subscriber = errors[0]
+    assert ids == [1, 2]
+    assert [arguments["id"] for arguments in origin] == [1, 2]
+    assert subscriber.callable_target.__name__ == "insert"
+
+
+@pytest.mark.asyncio
+async def test_batch_columns_conversion_error():
+    errors = []
+
+    @le.on(SensorEvent, batch_size=2, max_delay=10)
+    async def record(readings: le.Columns[SensorEvent]): ...
+
+    @le.on(le.ExceptionEvent)
+    async def report(exception: Exception):
+        errors.append(exception)
+
+    await le.publish(SensorEvent("s0", 0.5, 0, True))
+    await le.publish(SensorEvent("s1", "bad", 1, False))  # type: ignore
+    await asyncio.sleep(0.01)
+    assert len(errors) == 1 and isinstance(errors[0], TypeError)
+
+
+def test_batch_flush_on_loop_shutdown():
+    batches = []
+
+    @le.on(RowEvent, batch_size=100, max_delay=10)
+    async def insert(id: list[int]):
+        batches.append(id)
+
+    async def main():
+        for i in range(3):
+            await le.publish(RowEvent(i, ""))
+
+    try:
+        asyncio.run(main())
+        assert batches == [[0, 1, 2]]
+    finally:
+        insert.dispose()
+
+
+@pytest.mark.asyncio
+async def test_batch_closed():
+    from arclet.letoderea.batch import Batcher
+
+    batcher = Batcher(lambda id: None, batch_size=10)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.add({"id": 1})
+    assert not batcher.buffer
@@ -174,3 +174,50 @@ async def test_breakpoint_dispose():
     await asyncio.sleep(0.1)
 
     assert executed == [1, '1234', 1, '1234']
+
+
+class SessionEvent:
+    session: str
+    msg: str
+
+    def __init__(self, session: str, msg: str):
+        self.session = session
+        self.msg = msg
+
+    async def gather(self, context: Contexts):
+        context["msg"] = self.msg
+
+
+@pytest.mark.asyncio
+async def test_breakpoint_keyed():
+    calls = []
+
+    async def handler(msg: str):
+        calls.append(msg)
+        return msg.upper()
+
+    step = step_out(SessionEvent, handler, key=lambda e: e.session)
+
+    async def session(name: str, timeout: float = 0.0):
+        return await step.wait(name, default="timeout", timeout=timeout)
+
+    waiters = [asyncio.create_task(session(f"s{i}")) for i in range(100)]
+    slow = asyncio.create_task(session("slow", 0.05))
+    await asyncio.sleep(0)
+    assert len(step.waiters) == 101
+
+    await es.publish(SessionEvent("nobody", "skip"))
+    await es.publish(SessionEvent("s42", "hi"))
+    assert calls == ["hi"]
+    assert await waiters[42] == "HI"
+    assert "s42" not in step.waiters
+
+    assert await slow == "timeout"
+    assert "slow" not in step.waiters
+
+    step.dispose()
+    for waiter in waiters:
+        if waiter is not waiters[42]:
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+    assert not step.waiting
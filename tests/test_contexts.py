@@ -0,0 +1,76 @@
+import pytest
+
+import arclet.letoderea as le
+from arclet.letoderea import Contexts, LayeredContexts
+
+
+def test_layered_read_write():
+    base = Contexts(a=1, b=2)
+    ctx = LayeredContexts(base)
+    assert ctx["a"] == 1
+    assert ctx.get("b") == 2
+    assert ctx.get("c", 3) == 3
+    assert "a" in ctx and "c" not in ctx
+    ctx["a"] = 10
+    ctx.setdefault("b", 20)
+    ctx.setdefault("c", 30)
+    assert base == {"a": 1, "b": 2}
+    assert ctx == {"a": 10, "b": 2, "c": 30}
+    assert dict(ctx) == {"a": 10, "b": 2, "c": 30}
+    assert {**ctx} == {"a": 10, "b": 2, "c": 30}
+    assert sorted(ctx.keys()) == ["a", "b", "c"]
+    assert len(ctx) == 3
+
+
+def test_layered_delete_and_copy():
+    base = Contexts(a=1, b=2)
+    ctx = LayeredContexts(base)
+    snapshot = ctx.copy()
+    assert type(snapshot) is Contexts
+    del ctx["a"]
+    assert "a" not in ctx
+    assert ctx.pop("b") == 2
+    assert ctx.pop("b", None) is None
+    assert base == {"a": 1, "b": 2}
+    assert snapshot == {"a": 1, "b": 2}
+    ctx.clear()
+    assert not ctx
+
+
+@le.make_event
+class LayerEvent:
+    foo: str
+
+
+@pytest.mark.asyncio
+async def test_subscriber_writes_isolated():
+    seen = []
+
+    @le.on(LayerEvent)
+    async def _1(ctx: le.Contexts, foo: str):
+        ctx["foo"] = "changed"
+        seen.append(foo)
+
+    @le.on(LayerEvent)
+    async def _2(ctx: le.Contexts, foo: str):
+        seen.append(ctx["foo"])
+
+    await le.publish(LayerEvent("origin"))
+    assert seen == ["origin", "origin"]
+
+
+def test_ctx_item_interned():
+    import sys
+
+    item = le.CtxItem.make("".join(["$my", "_item"]))
+    assert item is sys.intern("$my_item")
+    assert LayerEvent.__event_fields__ == {"foo": str}  # type: ignore
+
+
+def test_layered_deep_lookup():
+    ctx = LayeredContexts(LayeredContexts(LayeredContexts(Contexts(a=1)), b=2))
+    assert ctx["a"] == 1
+    assert ctx.get("b") == 2
+    assert ctx.get("c") is None
+    with pytest.raises(KeyError):
+        ctx["c"]
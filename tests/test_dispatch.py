@@ -108,6 +108,97 @@ async def test_event_dispatch():
     assert executed == [1, 2, 3]
 
 
+@pytest.mark.asyncio
+async def test_codegen():
+    from arclet.letoderea.core import run_handler
+    from arclet.letoderea.exceptions import UnresolvedRequirement
+
+    executed = []
+
+    async def dep(foo: str):
+        return f"{foo}+dep"
+
+    @le.on(TestEvent, codegen=True, providers=[le.provide(type(None), "none", call=lambda _: le.Force(None))])
+    async def s0(foo: str, bar, none, ctx: le.Contexts, baz: int = 1, d=le.Depends(dep)):
+        assert foo == "f"
+        assert bar == "b"
+        assert none is None
+        assert ctx["foo"] == "f"
+        assert baz == 1
+        assert d == "f+dep"
+        executed.append(1)
+        return "0"
+
+    assert "handle" in s0.__dict__
+    assert await run_handler(s0, TestEvent("f", "b")) == "0"
+    res = await le.post(TestEvent("f", "b"))
+    assert res and res.value == "0"
+    assert executed == [1, 1]
+
+    @le.on(TestEvent, codegen=True, skip_req_missing=False)
+    async def s1(foo: str, age: int):  # pragma: no cover
+        print(foo, age)
+
+    with pytest.raises(UnresolvedRequirement):
+        await run_handler(s1, TestEvent("f", "b"))
+
+    s1.skip_req_missing = True
+    assert await run_handler(s1, TestEvent("f", "b")) is le.STOP
+
+
+@pytest.mark.asyncio
+async def test_exit_stack_unwound():
+    from contextlib import AsyncExitStack
+
+    from arclet.letoderea.core import run_handler
+
+    closed = []
+
+    for codegen in (False, True):
+
+        @le.on(TestEvent, codegen=codegen)
+        async def s0(foo: str, stack: AsyncExitStack):
+            stack.callback(closed.append, codegen)
+            return foo
+
+        assert await run_handler(s0, TestEvent("f", "b")) == "f"
+        s0.dispose()
+    assert closed == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_executor_mode():
+    import threading
+
+    from arclet.letoderea.core import run_handler
+
+    loop_thread = threading.get_ident()
+    checked = []
+
+    def check(foo: str):
+        checked.append(threading.get_ident())
+        return foo == "f"
+
+    @le.on(TestEvent, executor="inline")
+    @le.enter_if(check)
+    def s0(foo: str):
+        return threading.get_ident()
+
+    assert await run_handler(s0, TestEvent("f", "b")) == loop_thread
+    assert checked == [loop_thread]
+    assert await run_handler(s0, TestEvent("x", "b")) is le.STOP
+
+    checked.clear()
+
+    @le.on(TestEvent)
+    @le.enter_if(check)
+    def s1(foo: str):
+        return threading.get_ident()
+
+    assert await run_handler(s1, TestEvent("f", "b")) != loop_thread
+    assert checked[0] != loop_thread
+
+
 @pytest.mark.asyncio
 async def test_post():
     executed = []
@@ -275,3 +366,62 @@ async def test_async_generator():
         results.append(ans.value)
     assert results == ["f", "b", "b", "f"]
     assert executed == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit():
+    from arclet.letoderea.scope import configure
+    from arclet.letoderea.utils import _EventSystem
+
+    gate = asyncio.Event()
+    executed = []
+
+    @le.on(TestEvent)
+    async def s(foo: str):
+        await gate.wait()
+        executed.append(foo)
+
+    configure(max_in_flight=2)
+    try:
+        t1 = le.try_publish(TestEvent("1", "b"))
+        t2 = await le.publish_wait(TestEvent("2", "b"))
+        assert t1 and t2
+        assert le.try_publish(TestEvent("x", "b")) is None
+        waiting = asyncio.create_task(le.publish_wait(TestEvent("3", "b")))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        gate.set()
+        await asyncio.gather(t1, t2)
+        await (await waiting)
+        assert executed == ["1", "2", "3"]
+        assert _EventSystem.limiter.in_flight == 0
+    finally:
+        configure(max_in_flight=None)
+
+    gate.clear()
+    executed.clear()
+    scope = le.Scope.of("limited", max_in_flight=1)
+    scope.register(s.callable_target, TestEvent)
+    t = le.try_publish(TestEvent("1", "b"), scope=scope)
+    assert t
+    assert le.try_publish(TestEvent("2", "b"), scope=scope) is None
+    assert le.try_publish(TestEvent("3", "b"))
+    gate.set()
+    await t
+    assert scope.limiter.in_flight == 0
+
+
+def test_configure_keeps_unset_options():
+    from arclet.letoderea.scope import Scope, configure
+    from arclet.letoderea.utils import _EventSystem
+
+    controller = le.AdmissionController(max_in_flight=10)
+    configure(max_in_flight=100, admission=controller)
+    try:
+        configure(lazy=True)
+        assert Scope.global_lazy
+        assert _EventSystem.limiter.limit == 100
+        assert _EventSystem.admission is controller
+    finally:
+        configure(lazy=False, max_in_flight=None, admission=None)
+    assert _EventSystem.limiter.limit is None and _EventSystem.admission is None
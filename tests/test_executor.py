@@ -0,0 +1,119 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import AsyncExitStack
+from typing import Annotated, Optional
+
+import pytest
+
+import arclet.letoderea as le
+from arclet.letoderea.context import LayeredContexts
+from arclet.letoderea.core import run_handler
+
+
+@le.make_event
+class ExecutorEvent:
+    foo: str
+
+
+def square(foo: str, times: int = 2):
+    return os.getpid(), int(foo) ** times
+
+
+def numbers(foo: str):  # pragma: no cover
+    yield foo
+
+
+@pytest.mark.asyncio
+async def test_dedicated_executor():
+    pool = le.thread_pool(1, "letoderea-test")
+    scope = le.Scope.of("executor", executor=pool)
+    try:
+        @scope.register(event=ExecutorEvent)
+        def s0(foo: str):
+            return threading.current_thread().name
+
+        @scope.register(event=ExecutorEvent, executor="inline")
+        def s1(foo: str):
+            return threading.current_thread().name
+
+        assert (await run_handler(s0, ExecutorEvent("f"))).startswith("letoderea-test")
+        assert await run_handler(s1, ExecutorEvent("f")) == threading.current_thread().name
+        assert pool.max_workers == 1
+        stats = pool.stats()
+        assert stats.max_workers == 1
+        assert stats.completed == 1
+        assert stats.queued == stats.running == 0
+    finally:
+        scope.dispose()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_stats():
+    pool = le.thread_pool(2)
+    try:
+        futures = [asyncio.wrap_future(pool.submit(time.sleep, 0.1)) for _ in range(5)]
+        stats = pool.stats()
+        assert stats.max_workers == pool.max_workers == 2
+        assert stats.running == 2
+        assert stats.queued == 3
+        await asyncio.gather(*futures)
+        stats = pool.stats()
+        assert stats.completed == 5
+        assert stats.running == stats.queued == 0
+        assert 0 < stats.utilization <= 1
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_executor():
+    pool = le.process_pool(1)
+    scope = le.Scope.of("process", executor=pool)
+    try:
+        sub = scope.register(square, ExecutorEvent)
+        pid, res = await run_handler(sub, ExecutorEvent("3"))
+        assert pid != os.getpid()
+        assert res == 9
+        res = await le.post(ExecutorEvent("4"))
+        assert res and res.value[1] == 16
+        assert pool.stats().completed == 2
+    finally:
+        scope.dispose()
+        pool.shutdown()
+
+
+def test_process_reject():
+    scope = le.Scope.of("process_reject")
+    try:
+        with pytest.raises(TypeError):
+            scope.register(lambda foo: foo, ExecutorEvent, executor="process")
+
+        with pytest.raises(TypeError):
+            @scope.register(event=ExecutorEvent, executor="process")
+            def local(foo: str): ...  # pragma: no cover
+
+        with pytest.raises(TypeError):
+            scope.register(numbers, ExecutorEvent, executor="process")
+
+        for handler in (context_handler, layered_handler, optional_handler, annotated_handler):
+            with pytest.raises(TypeError):
+                scope.register(handler, ExecutorEvent, executor="process")
+
+        assert not scope.subscribers
+    finally:
+        scope.dispose()
+
+
+def context_handler(foo: str, ctx: le.Contexts): ...  # pragma: no cover
+
+
+def layered_handler(foo: str, ctx: LayeredContexts): ...  # pragma: no cover
+
+
+def optional_handler(foo: str, ctx: Optional[le.Contexts] = None): ...  # pragma: no cover
+
+
+def annotated_handler(foo: str, stack: Annotated[AsyncExitStack, "stack"]): ...  # pragma: no cover
@@ -36,3 +36,79 @@ async def test_event_dispatch():
 
     await asyncio.sleep(0.5)
     assert len(executed) == 2
+
+
+@dataclass
+class BatchFetchEvent:
+    index: int
+
+
+batch_pub = le.Publisher(BatchFetchEvent, "batch_fetch_event", fetch_workers=4)
+
+
+@pytest.mark.asyncio
+async def test_fetch_batch():
+    from arclet.letoderea.core import _loop_fetch
+
+    executed = []
+
+    @le.on(BatchFetchEvent)
+    async def _1(index: int):
+        await asyncio.sleep(0.1)
+        executed.append(index)
+
+    for i in range(8):
+        batch_pub.unsafe_push(BatchFetchEvent(i))
+
+    assert len(await batch_pub.supply_batch(3)) == 3
+    assert len(await batch_pub.supply_batch()) == 5
+    for _ in range(8):
+        batch_pub.event_queue.task_done()
+
+    tasks = [asyncio.create_task(_loop_fetch(batch_pub, 1)) for _ in range(batch_pub.fetch_workers)]
+    for i in range(8):
+        await batch_pub.push(BatchFetchEvent(i))
+    await asyncio.wait_for(batch_pub.event_queue.join(), 0.5)
+    assert sorted(executed) == list(range(8))
+    for task in tasks:
+        task.cancel()
+
+
+@dataclass
+class FaultyFetchEvent:
+    index: int
+
+
+async def _faulty_supplier(event: FaultyFetchEvent, context: le.Contexts):
+    if event.index == 0:
+        raise ValueError("broken supplier")
+    context["index"] = event.index
+
+
+faulty_pub = le.Publisher(FaultyFetchEvent, "faulty_fetch_event", _faulty_supplier)
+
+
+@pytest.mark.asyncio
+async def test_fetch_survives_errors_and_respects_limits():
+    from arclet.letoderea.core import _loop_fetch
+    from arclet.letoderea.utils import _EventSystem
+
+    executed = []
+    peak = 0
+
+    @le.on(FaultyFetchEvent)
+    async def _1(index: int):
+        nonlocal peak
+        peak = max(peak, _EventSystem.limiter.in_flight)
+        executed.append(index)
+
+    task = asyncio.create_task(_loop_fetch(faulty_pub))
+    try:
+        for i in range(3):
+            await faulty_pub.push(FaultyFetchEvent(i))
+        await asyncio.wait_for(faulty_pub.event_queue.join(), 0.5)
+        assert executed == [1, 2]
+        # 经由发布路径分发，占用并归还在途名额
+        assert peak == 1 and _EventSystem.limiter.in_flight == 0
+    finally:
+        task.cancel()
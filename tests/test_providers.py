@@ -137,3 +137,186 @@ async def test_shared_supplier():
     assert executed == [foo, foo, foo, foo]
 
     shared_suppliers.remove(_add_foo)
+
+
+@pytest.mark.asyncio
+async def test_shared_supplier_once():
+    called = []
+
+    async def _count(contexts: Contexts):
+        called.append(1)
+        contexts["name"] = "shared"
+
+    shared_suppliers.append(_count)
+    names = []
+
+    @on(ProviderEvent)
+    async def s4(name: str):
+        names.append(name)
+
+    @on(ProviderEvent1)
+    async def s5(name: str, is_true: bool):
+        assert is_true
+        names.append(name)
+
+    await publish(ProviderEvent1())
+    shared_suppliers.remove(_count)
+    assert called == [1]
+    assert names == ["shared", "shared"]
+
+
+@pytest.mark.asyncio
+async def test_shared_supplier_visibility():
+    seen = []
+
+    async def _peek(contexts: Contexts):
+        # shared_suppliers 先于发布者执行，只能看到事件与 inherit_ctx
+        seen.append((contexts.get("name"), contexts.get("origin")))
+
+    @on(ProviderEvent1)
+    async def s6(name: str): ...
+
+    shared_suppliers.append(_peek)
+    try:
+        inherit = Contexts(origin="caller")
+        await publish(ProviderEvent1(), inherit_ctx=inherit)
+        contexts = await generate_contexts(ProviderEvent1(), inherit_ctx=Contexts(origin="caller"))
+    finally:
+        shared_suppliers.remove(_peek)
+        s6.dispose()
+    assert seen == [(None, "caller"), (None, "caller")]
+    # 生成的上下文写回调用方传入的 inherit_ctx
+    assert inherit["name"] == "Letoderea" and inherit["origin"] == "caller"
+    assert isinstance(inherit["$event"], ProviderEvent1)
+    assert contexts["origin"] == "caller"
+
+
+def test_validate_sees_default():
+    from arclet.letoderea.subscriber import Subscriber
+
+    optional = provide(int, call=lambda ctx: 1, validate=lambda p: p.default is None)
+
+    class DefaultFactory(ProviderFactory):
+        def validate(self, param: Param):
+            return IntProvider() if param.default == 7 else None
+
+    async def a(x: int = None): ...  # type: ignore
+
+    async def b(x: int = 7): ...
+
+    providers = [optional, DefaultFactory()]
+    assert Subscriber(a, providers=providers).params[0].providers == [optional]
+    assert [p.__class__ for p in Subscriber(b, providers=providers).params[0].providers] == [IntProvider]
+
+
+def test_provider_registry():
+    from arclet.letoderea.subscriber import Subscriber
+
+    calls = []
+
+    class CountingProvider(Provider[int]):
+        cacheable = True
+
+        def validate(self, param: Param):
+            calls.append(param.name)
+            return param.name == "count"
+
+        async def __call__(self, context: Contexts):
+            return 1
+
+    class FreshProvider(CountingProvider):
+        cacheable = False
+
+    named = provide(str, "key", call="key")
+    counting = CountingProvider()
+    providers = [named, counting]
+
+    async def handler(count: int, other: str): ...
+
+    first = Subscriber(handler, providers=providers)
+    assert calls == ["count", "other"]
+    assert first.params[0].providers == [counting]
+    assert first.params[1].providers == []
+    Subscriber(handler, providers=providers)
+    assert calls == ["count", "other"]
+
+    async def keyed(key: str): ...
+
+    assert Subscriber(keyed, providers=providers).params[0].providers == [named]
+    assert calls == ["count", "other", "key"]
+
+    fresh = FreshProvider()
+    Subscriber(handler, providers=[fresh])
+    Subscriber(handler, providers=[fresh])
+    assert calls[3:] == ["count", "other", "count", "other"]
+
+
+async def signature_handler(count: int, other: str = "", *, flag: bool = False, session): ...
+
+
+def test_fast_signatures():
+    from functools import wraps
+
+    from tarina import Empty, signatures
+
+    from arclet.letoderea.subscriber import _signatures
+
+    def wrapped(*args, **kwargs): ...  # pragma: no cover
+
+    @wraps(signature_handler)
+    def decorated(*args, **kwargs): ...  # pragma: no cover
+
+    for target in (signature_handler, wrapped, decorated, IntProvider().__call__):
+        assert _signatures(target) == signatures(target)
+    assert _signatures(signature_handler) == [("count", int, Empty), ("other", str, ""), ("flag", bool, False), ("session", None, Empty)]
+
+
+@pytest.mark.asyncio
+async def test_resolution_per_event_type():
+    from arclet.letoderea import EVENT
+    from arclet.letoderea.subscriber import Subscriber
+
+    class EventA: ...
+
+    class EventB: ...
+
+    class AProvider(Provider[str]):
+        async def __call__(self, context: Contexts):
+            return "a" if isinstance(context[EVENT], EventA) else None
+
+    class BProvider(Provider[str]):
+        async def __call__(self, context: Contexts):
+            return "b" if isinstance(context[EVENT], EventB) else None
+
+    results = []
+
+    async def handler(value: str):
+        results.append(value)
+
+    sub = Subscriber(handler, providers=[AProvider(), BProvider()])
+    for event in (EventA(), EventB(), EventA(), EventB(), EventA()):
+        await sub.handle(Contexts({EVENT: event}))
+    assert results == ["a", "b", "a", "b", "a"]
+    assert sub.resolution == {"value": (3, 2)}
+
+
+def test_functional_provider():
+    from arclet.letoderea import FunctionalProvider
+    from arclet.letoderea.provider import get_providers
+
+    first = provide(str, "foo", call="bar", priority=5)
+    second = provide(int, call=lambda ctx: 1, validate=lambda p: p.name == "num", _id="num")
+    assert first.__class__ is second.__class__ is FunctionalProvider
+    assert first.priority == 5 and first.names == frozenset(("foo",))
+    assert second.priority == 20 and second.names is None
+    assert repr(first) == "_Provider(origin=<class 'str'>, target='foo')"
+    assert repr(second) == "Num(origin=<class 'int'>)"
+    assert first.validate(Param("foo", str, None, [])) and not first.validate(Param("foo", int, None, []))
+    assert second.validate(Param("num", str, None, []))
+
+    class MultiEvent:
+        providers = [first, second]
+
+    assert get_providers(MultiEvent) == [first, second]
+    with pytest.raises(ValueError):
+        provide(str)
@@ -164,3 +164,207 @@ async def test_validate():
     result2 = [res.value async for res in le.waterfall(CallEvent("test", "not_test", "World!", {}))]
     assert result1 == ["'test' by test", "'test' by test and must be test"]
     assert result2 == ["'test' by not_test"]
+
+
+@dataclass
+class OverflowEvent:
+    index: int
+
+
+@pytest.mark.asyncio
+async def test_queue_overflow():
+    import asyncio
+
+    oldest = le.Publisher(OverflowEvent, "overflow_oldest", queue_size=2, overflow="drop_oldest")
+    newest = le.Publisher(OverflowEvent, "overflow_newest", queue_size=2, overflow="drop_newest")
+    block = le.Publisher(OverflowEvent, "overflow_block", queue_size=2)
+    for i in range(4):
+        oldest.unsafe_push(OverflowEvent(i))
+        await newest.push(OverflowEvent(i))
+    assert [e.index for e in await oldest.supply_batch()] == [2, 3]
+    assert [e.index for e in await newest.supply_batch()] == [0, 1]
+    assert oldest.shed == newest.shed == 2
+    block.unsafe_push(OverflowEvent(0))
+    block.unsafe_push(OverflowEvent(1))
+    with pytest.raises(asyncio.QueueFull):
+        block.unsafe_push(OverflowEvent(2))
+    assert block.shed == 0
+    for p in (oldest, newest, block):
+        p.dispose()
+
+
+@dataclass
+class AdmissionEvent:
+    index: int
+
+
+@dataclass
+class CriticalEvent:
+    index: int
+
+
+@pytest.mark.asyncio
+async def test_admission():
+    import asyncio
+
+    from arclet.letoderea.scope import configure
+
+    normal = le.define(AdmissionEvent, name="admission_normal")
+    critical = le.Publisher(CriticalEvent, "admission_critical", priority=0)
+    gate = asyncio.Event()
+    executed = []
+
+    @le.on(AdmissionEvent)
+    @le.on(CriticalEvent)
+    async def s(index: int):
+        await gate.wait()
+        executed.append(index)
+
+    controller = le.AdmissionController(max_in_flight=1)
+    configure(admission=controller)
+    try:
+        t1 = le.publish(AdmissionEvent(1))
+        shed = le.publish(AdmissionEvent(2))
+        assert shed.done() and shed.result() is None
+        assert le.try_publish(AdmissionEvent(3)) is None
+        assert (await le.post(AdmissionEvent(4))) is None
+        t2 = le.publish(CriticalEvent(5))
+        gate.set()
+        await asyncio.gather(t1, t2)
+        assert executed == [1, 5]
+        assert normal.shed == 3
+        assert controller.stats() == {"admission_normal": 3}
+    finally:
+        configure(admission=None)
+        normal.dispose()
+        critical.dispose()
+
+
+@pytest.mark.asyncio
+async def test_admission_lag():
+    import asyncio
+    import time
+
+    from arclet.letoderea.utils import _EventSystem
+
+    controller = le.AdmissionController(max_lag=0.05, interval=0.05)
+    assert controller.pressure() == 0
+    assert controller._monitor in _EventSystem.ref_tasks
+    await asyncio.sleep(0)
+    time.sleep(0.2)
+    await asyncio.sleep(0.01)
+    assert controller.pressure() >= 1
+    controller.close()
+
+
+@dataclass
+class ChannelEvent:
+    channel: int
+    index: int
+
+
+@pytest.mark.asyncio
+async def test_partition():
+    import asyncio
+    import time
+
+    from arclet.letoderea.core import _lanes
+
+    part = le.Publisher(ChannelEvent, "partition_event", partition_key=lambda e: e.channel, max_lanes=4, lane_idle=0.1)
+    executed = []
+
+    @le.on(ChannelEvent)
+    async def s(channel: int, index: int):
+        await asyncio.sleep(0.05 if index == 0 else 0)
+        executed.append((channel, index))
+        return index
+
+    start = time.perf_counter()
+    tasks = [le.publish(ChannelEvent(channel, index)) for index in range(3) for channel in range(2)]
+    await asyncio.gather(*tasks)
+    assert time.perf_counter() - start < 0.1
+    for channel in range(2):
+        assert [i for c, i in executed if c == channel] == [0, 1, 2]
+    assert len(_lanes["partition_event"]) == 2
+    res = await le.post(ChannelEvent(0, 3))
+    assert res and res.value == 3
+
+    await asyncio.sleep(0.2)
+    assert not _lanes["partition_event"]
+    part.dispose()
+
+
+@pytest.mark.asyncio
+async def test_partition_lane_failure():
+    import asyncio
+
+    from arclet.letoderea.core import _lanes
+    from arclet.letoderea.utils import _EventSystem
+
+    part = le.Publisher(ChannelEvent, "partition_failure_event", partition_key=lambda e: e.channel, max_lanes=1)
+    gate = asyncio.Event()
+    executed = []
+
+    @le.on(ChannelEvent)
+    async def s(index: int):
+        await gate.wait()
+        executed.append(index)
+
+    running = le.publish(ChannelEvent(0, 0))
+    queued = le.publish(ChannelEvent(0, 1))
+    await asyncio.sleep(0)
+    # 取消返回的 Future 会取消正在进行的分发
+    running.cancel()
+    await asyncio.sleep(0.01)
+    assert executed == []
+
+    # 通道任务意外结束时移出通道表，排队中的分发被取消并归还名额
+    _lanes["partition_failure_event"][0].task.cancel()  # type: ignore
+    await asyncio.sleep(0.01)
+    assert queued.cancelled()
+    assert not _lanes["partition_failure_event"]
+    assert _EventSystem.limiter.in_flight == 0
+
+    gate.set()
+    await le.publish(ChannelEvent(0, 2))
+    assert executed == [2]
+    part.dispose()
+
+
+@le.make_event
+class QuietEvent:
+    level: str
+
+
+@pytest.mark.asyncio
+async def test_unheard_fast_path():
+    from arclet.letoderea.scope import _listeners
+    from arclet.letoderea.utils import _EventSystem
+
+    pub_id = QuietEvent.__publisher__  # type: ignore
+    tasks = len(_EventSystem.ref_tasks)
+    res = le.publish(QuietEvent("debug"))
+    assert res.done() and len(_EventSystem.ref_tasks) == tasks
+    # 每次返回新的 Future，取消其中一个不影响其他调用方
+    other = le.publish(QuietEvent("debug"))
+    assert other is not res
+    other.cancel()
+    assert res.result() is None
+    assert await le.post(QuietEvent("debug")) is None
+
+    scope = le.Scope.of("quiet")
+    sub = scope.register(lambda level: level, QuietEvent, label="quiet", executor="inline")
+    assert _listeners[pub_id] == 1
+    res = await le.post(QuietEvent("debug"))
+    assert res and res.value == "debug"
+
+    scope.disable()
+    assert pub_id not in _listeners
+    assert le.publish(QuietEvent("debug")).done()
+    scope.enable()
+    assert _listeners[pub_id] == 1
+    assert not le.publish(QuietEvent("debug"), scope).done()
+
+    sub.dispose()
+    assert pub_id not in _listeners
+    assert le.publish(QuietEvent("debug"), "quiet").done()
@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import pytest
+
+import arclet.letoderea as le
+
+
+@le.make_event
+class TickEvent:
+    name: str
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def settle(predicate=None, timeout: float = 1.0):
+    """让出事件循环直到条件满足；未给出条件时只等待已发布的事件处理完毕"""
+    if predicate is None:
+        for _ in range(20):
+            await asyncio.sleep(0)
+        return
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_publish_after_and_at():
+    fired = []
+
+    @le.on(TickEvent)
+    async def record(name: str):
+        fired.append(name)
+
+    le.publish_after(0.02, TickEvent("after"))
+    le.publish_at(time.time() + 0.04, TickEvent("at"))
+    cancelled = le.publish_after(0.02, TickEvent("cancelled"))
+    cancelled()
+    assert cancelled.cancelled
+    assert not fired
+    await settle(lambda: len(fired) >= 2)
+    await asyncio.sleep(0.05)
+    assert fired == ["after", "at"]
+    record.dispose()
+
+
+@pytest.mark.asyncio
+async def test_publish_every_with_effect():
+    fired = []
+    scope = le.Scope.of("schedule")
+
+    @scope.register(event=TickEvent)
+    async def record(name: str):
+        fired.append(name)
+
+    scope.effect(lambda: le.publish_every(0.02, TickEvent("every"), scope))
+    await settle(lambda: len(fired) >= 2)
+    assert len(fired) >= 2
+    scope.dispose()
+    count = len(fired)
+    await asyncio.sleep(0.05)
+    assert len(fired) == count
+
+
+@pytest.mark.asyncio
+async def test_timer_wheel_interval():
+    fired = []
+
+    @le.on(TickEvent)
+    async def record(name: str):
+        fired.append(name)
+
+    clock = FakeClock()
+    wheel = le.TimerWheel(tick=1, clock=clock)
+    every = wheel.schedule(2, TickEvent("every"), interval=3)
+    wheel.schedule(4, TickEvent("once"))
+    for now, expected in ((1, []), (2, ["every"]), (4, ["every", "once"]), (5, ["every", "once", "every"])):
+        clock.now = now
+        wheel.poll()
+        await settle()
+        assert fired == expected
+    every()
+    clock.now = 20
+    wheel.poll()
+    await settle()
+    assert len(fired) == 3
+    assert wheel.size == 0
+    record.dispose()
+
+
+@pytest.mark.asyncio
+async def test_timer_wheel_cascade():
+    fired = []
+
+    @le.on(TickEvent)
+    async def record(name: str):
+        fired.append(name)
+
+    clock = FakeClock()
+    wheel = le.TimerWheel(tick=1, bits=2, levels=2, clock=clock)
+    for delay in (30, 2, 13, 6):
+        wheel.schedule(delay, TickEvent(str(delay)))
+    assert wheel.size == 4
+    for now in range(1, 31):
+        clock.now = now
+        wheel.poll()
+        await settle()
+        assert fired == [str(delay) for delay in (2, 6, 13, 30) if delay <= now]
+    assert wheel.size == 0
+    record.dispose()
+
+
+@pytest.mark.asyncio
+async def test_timer_wheel_publish_failure(monkeypatch):
+    from arclet.letoderea import schedule
+    from arclet.letoderea.utils import _EventSystem
+
+    published = []
+
+    def publish(event, scope=None):
+        if event.name == "broken":
+            raise RuntimeError("rejected")
+        published.append(event.name)
+
+    monkeypatch.setattr(schedule, "publish", publish)
+    le.switch_print_traceback(False)
+    clock = FakeClock()
+    wheel = le.TimerWheel(tick=1, clock=clock)
+    try:
+        wheel.schedule(1, TickEvent("broken"))
+        wheel.schedule(1, TickEvent("every"), interval=1)
+        wheel.schedule(1, TickEvent("once"))
+        assert wheel._driver in _EventSystem.ref_tasks
+        clock.now = 1
+        wheel.poll()
+        assert sorted(published) == ["every", "once"]
+        clock.now = 2
+        wheel.poll()
+        assert sorted(published) == ["every", "every", "once"]
+        assert wheel.size == 1
+    finally:
+        le.switch_print_traceback(True)
+        wheel.clear()
@@ -42,3 +42,153 @@ async def test_event_dispatch():
     scope2.enable()
     await le.publish(ScopeEvent("f"), scope="scope2")
     assert executed == [2]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_plan_cache():
+    from arclet.letoderea.core import _plans, get_plan
+    from arclet.letoderea.publisher import get_publishers
+
+    scope = le.Scope.of("plan_scope")
+    executed = []
+
+    @scope.register(event=ScopeEvent, priority=20)
+    async def _1(foo: str):
+        executed.append(1)
+
+    pubs = get_publishers(ScopeEvent("f"))
+    plan = get_plan(pubs, scope)
+    assert get_plan(pubs, scope) is plan
+    assert (scope, frozenset(pubs)) in _plans
+
+    @scope.register(event=ScopeEvent, priority=10)
+    async def _2(foo: str):
+        executed.append(2)
+
+    new_plan = get_plan(pubs, scope)
+    assert new_plan is not plan
+    assert [subs[0] for subs in new_plan.values()] == [_2, _1]
+
+    await le.publish(ScopeEvent("f"), scope=scope)
+    assert executed == [2, 1]
+    executed.clear()
+
+    _2.dispose()
+    await le.publish(ScopeEvent("f"), scope=scope)
+    assert executed == [1]
+    executed.clear()
+
+    scope.disable()
+    assert get_plan(pubs, scope) == {}
+    scope.enable()
+    await le.publish(ScopeEvent("f"), scope=scope)
+    assert executed == [1]
+
+
+@le.make_event
+class OtherScopeEvent:
+    bar: str
+
+
+def test_publisher_index():
+    scope = le.Scope.of("index_scope")
+
+    @scope.register(event=ScopeEvent, priority=20)
+    async def _1(foo: str): ...
+
+    @scope.register(event=OtherScopeEvent)
+    async def _2(bar: str): ...
+
+    @scope.register(event=ScopeEvent, priority=10)
+    async def _3(foo: str): ...
+
+    @scope.register()
+    async def _4(): ...
+
+    pub_id = ScopeEvent.__publisher__  # type: ignore
+    assert [slot.subscriber for slot in scope.buckets([pub_id], pass_backend=False)[0]] == [_3, _1]
+    assert list(scope.iter({pub_id})) == [_3, _4, _1]
+    assert [slot.subscriber for slot in scope.subscribers] == [_1, _2, _3, _4]
+
+    _3.dispose()
+    assert list(scope.iter({pub_id}, pass_backend=False)) == [_1]
+    _2.dispose()
+    assert scope.buckets([OtherScopeEvent.__publisher__], pass_backend=False) == []  # type: ignore
+
+
+def test_publisher_index_churn():
+    scope = le.Scope.of("churn_scope")
+    pub_id = ScopeEvent.__publisher__  # type: ignore
+
+    async def handler(foo: str): ...
+
+    subs = [scope.register(handler, ScopeEvent, priority=i % 3) for i in range(12)]
+    for sub in subs[::2]:
+        sub.dispose()
+    subs.extend(scope.register(handler, ScopeEvent, priority=i % 3) for i in range(6))
+    for sub in subs[1:6:2]:
+        sub.dispose()
+    bucket = scope.buckets([pub_id], pass_backend=False)[0]
+    assert bucket == sorted(bucket, key=lambda slot: (slot.priority, slot.order))
+    assert len(bucket) == 9
+    assert {slot.subscriber.id for slot in bucket} == {slot.subscriber.id for slot in scope.subscribers}
+    scope.dispose()
+
+
+def test_toggle_availability():
+    scope = le.Scope.of("toggle_scope")
+
+    @scope.register(event=ScopeEvent)
+    async def _1(foo: str): ...
+
+    assert _1.available
+    scope.disable()
+    assert not _1.available
+    scope.enable()
+    assert _1.available
+    _1.dispose()
+    assert scope.subscribers == ()
+
+
+@pytest.mark.asyncio
+async def test_lazy_compile():
+    scope = le.Scope.of("lazy_scope")
+    executed = []
+
+    @scope.register(event=ScopeEvent, lazy=True)
+    async def _1(foo: str):
+        executed.append(foo)
+
+    @scope.register(event=ScopeEvent, lazy=True)
+    async def _2(foo: str): ...
+
+    assert _1._params is None and _2._params is None
+    await le.publish(ScopeEvent("a"), scope)
+    assert executed == ["a"]
+    assert _1._params is not None and _2._params is not None
+    await le.publish(ScopeEvent("b"), scope)
+    assert executed == ["a", "b"]
+
+    @scope.register(event=ScopeEvent, lazy=True)
+    async def _3(foo: str): ...
+
+    assert scope.warmup() == 1
+    assert _3._params is not None
+    assert scope.warmup() == 0
+    scope.dispose()
+
+
+def test_configure():
+    from arclet.letoderea.scope import Scope, configure
+
+    configure(skip_req_missing=True, codegen=True, executor="inline")
+    try:
+        configure(lazy=True)
+        assert Scope.global_skip_req_missing and Scope.global_codegen and Scope.global_lazy
+        assert Scope.global_executor == "inline"
+        configure(skip_req_missing=None, executor=None)
+        assert not Scope.global_skip_req_missing
+        assert Scope.global_executor == "thread"
+        assert Scope.global_codegen
+    finally:
+        configure(skip_req_missing=False, codegen=False, executor=None, lazy=False)
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+import arclet.letoderea as le
+
+
+@le.make_event
+class HitEvent:
+    user: str
+    cost: int
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_tumbling_window():
+    clock = FakeClock()
+    window = le.Window(HitEvent, 1.0, key=lambda e: e.user, aggregate=lambda acc, e: acc + e.cost, initial=int, clock=clock)
+    closed = []
+
+    @le.use(window)
+    async def hits(key, start: float, end: float, count: int, value: int):
+        closed.append((key, start, end, count, value))
+
+    for user, cost in [("a", 1), ("b", 2), ("a", 3)]:
+        await le.publish(HitEvent(user, cost))
+    assert window.state == 2
+    clock.now = 100.5
+    await le.publish(HitEvent("a", 4))
+    clock.now = 101.2
+    await le.publish(HitEvent("a", 5))
+    window._close_due()
+    await asyncio.sleep(0.01)
+    assert sorted(closed) == [("a", 100.0, 101.0, 3, 8), ("b", 100.0, 101.0, 1, 2)]
+    assert window.state == 1
+
+    await window.close()
+    assert closed[-1] == ("a", 101.0, 102.0, 1, 5)
+    assert window.state == 0
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_and_cap():
+    clock = FakeClock()
+    window = le.Window(HitEvent, 1.0, 0.5, key=lambda e: e.user, max_state=3, clock=clock)
+    closed = []
+
+    @le.use(window)
+    async def users(key, start: float, count: int):
+        closed.append((key, start, count))
+
+    await le.publish(HitEvent("a", 0))
+    assert sorted(window.windows) == [199, 200]
+    clock.now = 100.6
+    await le.publish(HitEvent("a", 0))
+    await le.publish(HitEvent("b", 0))
+    assert window.state == 3
+    assert window.shed == 1
+    clock.now = 101.0
+    window._close_due()
+    await asyncio.sleep(0.01)
+    assert closed == [("a", 99.5, 1), ("a", 100.0, 2)]
+
+    window.flush()
+    await asyncio.sleep(0.01)
+    assert closed[2:] == [("a", 100.5, 1)]
+    window.dispose()